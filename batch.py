@@ -0,0 +1,83 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from patterns import pattern_string, feedback
+from wordle import WordleSolver, load_index, solve_cache
+
+
+def solve_state(state, n=10):
+    greens, yellows, blacks = state
+    return WordleSolver(greens, yellows, blacks).word_suggestions.top(n)
+
+
+def _solve_chunk(states, n):
+    return [solve_state(state, n) for state in states]
+
+
+def _pool_context():
+    # Forked workers inherit the already loaded index and memory-mapped
+    # lexicon instead of each loading their own copy.
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def solve_batch(states, n=10, workers=None, chunksize=64):
+    # states is a list of (greens, yellows, blacks); returns the top n
+    # (word, freq) suggestions for each, in order.
+    load_index()
+    if workers == 1:
+        return _solve_chunk(states, n)
+
+    chunks = [states[i:i + chunksize] for i in range(0, len(states), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(), initializer=load_index) as pool:
+        results = pool.map(_solve_chunk, chunks, [n] * len(chunks))
+        return [suggestions for chunk in results for suggestions in chunk]
+
+
+def random_state(rng, words, turns):
+    # Constraints left after playing `turns` random guesses against a random answer.
+    answer = rng.choice(words)
+    greens = ['.'] * 5
+    yellows = []
+    blacks = set()
+    for guess in rng.sample(words, turns):
+        colours = pattern_string(feedback(guess, answer))
+        yellow = ''
+        for pos, (char, colour) in enumerate(zip(guess, colours)):
+            if colour == 'g':
+                greens[pos] = char
+            yellow += char if colour == 'y' else '.'
+            if colour == 'b' and char not in answer:
+                blacks.add(char)
+        if yellow != '.....':
+            yellows.append(yellow)
+
+    return ''.join(greens), yellows, ''.join(sorted(blacks))
+
+
+def benchmark(games=2000, workers=None, seed=0):
+    rng = random.Random(seed)
+    words = list(load_index().words)
+    states = [random_state(rng, words, rng.randint(0, 4)) for _ in range(games)]
+
+    for n_workers in (1, workers or os.cpu_count()):
+        # Each run starts cold; forked workers would otherwise inherit the
+        # results of the previous run and time cache lookups.
+        solve_cache.clear()
+        start = time.perf_counter()
+        solve_batch(states, workers=n_workers)
+        elapsed = time.perf_counter() - start
+        print(f'{n_workers:>3} worker(s): {games} states in {elapsed:.2f}s ({games / elapsed:,.0f} states/s)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Batch solving throughput benchmark')
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    benchmark(args.games, args.workers, args.seed)
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+import numpy as np
+
+# Rough per-entry cost of the dict slot, key object and array header.
+ENTRY_OVERHEAD = 200
+
+
+class SolveCache():
+    # LRU cache of solve results (candidate index arrays) keyed by canonical
+    # solver state, bounded by an approximate memory budget. With disk_dir set
+    # every result is also written there and memory misses fall back to it.
+    # Nothing is ever removed from disk_dir: it grows by a file per distinct
+    # state, so it should be a directory that can be cleared at any time.
+    def __init__(self, max_bytes=64 * 2**20, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @staticmethod
+    def _size(key, candidates):
+        return sys.getsizeof(key) + candidates.nbytes + ENTRY_OVERHEAD
+
+    def _disk_path(self, key):
+        name = hashlib.sha1(key.encode('ascii')).hexdigest()
+        return os.path.join(self.disk_dir, name[:2], f'{name}.npy')
+
+    def get(self, key):
+        candidates = self._entries.get(key)
+        if candidates is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return candidates
+
+        if self.disk_dir is not None:
+            try:
+                candidates = np.load(self._disk_path(key))
+            except (OSError, ValueError):
+                pass
+            else:
+                self.disk_hits += 1
+                return self._store(key, candidates)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, candidates):
+        candidates = self._store(key, candidates)
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f'{path}.{os.getpid()}.tmp'
+                with open(tmp, 'wb') as f:
+                    np.save(f, candidates)
+                os.replace(tmp, path)
+        return candidates
+
+    def configure(self, max_bytes=64 * 2**20, disk_dir=None):
+        # Same settings as __init__, changed in place so that every module
+        # holding this cache keeps sharing it. Entries over a smaller budget
+        # are evicted.
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._evict()
+
+    def _store(self, key, candidates):
+        # Entries are shared between solvers, so they are stored read-only.
+        candidates = np.array(candidates, dtype=np.int32)
+        candidates.flags.writeable = False
+        size = self._size(key, candidates)
+        if size > self.max_bytes:
+            return candidates
+
+        if key in self._entries:
+            self.bytes -= self._size(key, self._entries.pop(key))
+        self._entries[key] = candidates
+        self.bytes += size
+        self._evict()
+        return candidates
+
+    def _evict(self):
+        while self.bytes > self.max_bytes:
+            old_key, old = self._entries.popitem(last=False)
+            self.bytes -= self._size(old_key, old)
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+        }
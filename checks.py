@@ -0,0 +1,156 @@
+import argparse
+import random
+import numpy as np
+from compact import CompactState
+from opening_book import build_book
+from patterns import feedback, pattern_matrix, pattern_string
+from wordle import WordleSolver, _books, load_index, opening_book
+
+# Consistency checks for the parts of the solver that break quietly, run with
+# `python checks.py`. Each check raises AssertionError on the first mismatch.
+
+
+def _by_hand(rounds, length=5):
+    # The same feedback entered as greens, yellow sequences and black letters,
+    # the way menu options 1-3 and the server's constraint form take it.
+    solver = WordleSolver(length=length)
+    greens = list(solver.greens)
+    for guess, colours in rounds:
+        for pos, (char, colour) in enumerate(zip(guess, colours)):
+            if colour == 'g':
+                greens[pos] = char
+    solver.greens = ''.join(greens)
+    for guess, colours in rounds:
+        yellow = ''.join(char if colour == 'y' else '.' for char, colour in zip(guess, colours))
+        if yellow != '.' * length:
+            solver.add_yellow(yellow)
+    solver.add_blacks(''.join(char for guess, colours in rounds for char, colour in zip(guess, colours)
+                              if colour == 'b'))
+    solver.solve()
+    return solver
+
+
+def _by_hand_too(rounds):
+    # Whether _by_hand() can express the feedback: a repeated letter needs
+    # count bounds unless its copies are all green or all black.
+    for guess, colours in rounds:
+        for char in set(guess):
+            marks = set(colour for c, colour in zip(guess, colours) if c == char)
+            if guess.count(char) > 1 and marks not in ({'g'}, {'b'}):
+                return False
+    return True
+
+
+def _by_guess(rounds):
+    solver = WordleSolver()
+    state = CompactState()
+    for guess, colours in rounds:
+        solver.add_guess(guess, colours)
+        state.add_guess(guess, colours)
+    solver.solve()
+    assert state.state_key() == solver.state_key(), (rounds, state.state_key(), solver.state_key())
+    return solver
+
+
+def check_state_keys(games=300, seed=0):
+    # Guesses without repeated letters can be entered either way, and both
+    # must give the same state key, or they miss each other in the solve
+    # cache and the opening book.
+    rounds = [
+        [('rates', 'ybbbb')],
+        [('speed', 'bbggb')],
+        [('crane', 'bybbg'), ('sault', 'byybb')],
+    ]
+    rng = random.Random(seed)
+    words = [word for word in load_index().words[:5000] if len(set(word)) == 5]
+    for _ in range(games):
+        answer = rng.choice(words)
+        guesses = rng.sample(words, rng.randint(1, 4))
+        rounds.append([(guess, pattern_string(feedback(guess, answer))) for guess in guesses])
+
+    for game in rounds:
+        guessed, manual = _by_guess(game), _by_hand(game)
+        assert guessed.state_key() == manual.state_key(), (game, guessed.state_key(), manual.state_key())
+        assert np.array_equal(guessed._candidates, manual._candidates), game
+    return len(rounds)
+
+
+def check_patterns(words=300, seed=0):
+    # pattern_matrix() against feedback() one pair at a time, on lexicon words
+    # with repeated letters and on made-up words over a few letters, which
+    # repeat far more, at 5 and 6 letters.
+    rng = random.Random(seed)
+    repeats = [str(word) for word in load_index().words[:20000] if len(set(word)) < 5]
+    cases = 0
+    for length, pool in ((5, repeats), (5, None), (6, None)):
+        if pool is None:
+            pool = [''.join(rng.choice('aabes') for _ in range(length)) for _ in range(words)]
+        guesses, answers = rng.sample(pool, words // 2), rng.sample(pool, words // 2)
+        matrix = pattern_matrix(guesses, answers, length)
+        for i, guess in enumerate(guesses):
+            for j, answer in enumerate(answers):
+                assert matrix[i, j] == feedback(guess, answer), (guess, answer)
+        cases += matrix.size
+    return cases
+
+
+def check_add_guess(games=200, seed=0):
+    # The survivors of add_guess() are exactly the words that would have
+    # given the same feedback to every guess, repeated letters included.
+    rng = random.Random(seed)
+    words = [str(word) for word in load_index().words]
+    repeats = [word for word in words[:20000] if len(set(word)) < 5]
+    for _ in range(games):
+        answer = rng.choice(words[:2500] + repeats[:2500])
+        solver = WordleSolver()
+        state = CompactState()
+        expected = np.arange(len(words))
+        for _ in range(rng.randint(1, 4)):
+            guess = rng.choice(repeats if rng.random() < 0.5 else words)
+            code = feedback(guess, answer)
+            solver.add_guess(guess, pattern_string(code))
+            state.add_guess(guess, pattern_string(code))
+            expected = expected[pattern_matrix([guess], [words[i] for i in expected])[0] == code]
+        solver.solve()
+        assert np.array_equal(solver._candidates, expected), (answer, solver.state_key())
+        assert np.array_equal(state.candidates(), expected), (answer, state.state_key())
+    return games
+
+
+def check_book():
+    # Every second-ply position of the opening book is found whether the
+    # opening's feedback comes in as a guess or by hand. The book is built
+    # first if there is none.
+    if not opening_book():
+        build_book()
+        _books.clear()
+    book = opening_book()
+    opening = book[WordleSolver().state_key()]
+    codes = set(pattern_matrix([opening], list(load_index().words))[0].tolist())
+    cases = 0
+    for colours in sorted(pattern_string(code) for code in codes):
+        rounds = [(opening, colours)]
+        if colours == 'ggggg' or not _by_hand_too(rounds):
+            continue
+        key = _by_guess(rounds).state_key()
+        assert key in book, (rounds, key)
+        assert _by_hand(rounds).state_key() == key, (rounds, key)
+        cases += 1
+    return cases
+
+
+CHECKS = {
+    'patterns': check_patterns,
+    'add_guess': check_add_guess,
+    'state_keys': check_state_keys,
+    'book': check_book,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the solver consistency checks')
+    parser.add_argument('checks', nargs='*', help=f"any of {', '.join(CHECKS)}; default: all of them")
+    args = parser.parse_args()
+
+    for name in args.checks or CHECKS:
+        print(f'{name}: {CHECKS[name]()} cases ok')
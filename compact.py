@@ -0,0 +1,270 @@
+import argparse
+import random
+import struct
+import sys
+import time
+import numpy as np
+from patterns import feedback, pattern_string
+from wordle import LETTERS, Suggestions, WordleSolver, load_index, opening_book, recommender, solve_cache
+
+# magic, word length, whether the bitset follows, lexicon fingerprint,
+# lexicon size
+HEADER = struct.Struct('<4sB?2x12sI')
+MAGIC = b'WSS1'
+
+MASK_DTYPE = np.dtype('<u4')
+
+
+class CompactState():
+    # A WordleSolver state packed into three flat arrays: masks holds the
+    # green letter and the letters ruled out by yellows at each position,
+    # then the black letters; counts holds the minimum and maximum count of
+    # each letter; bitset marks the surviving lexicon words. The arrays can
+    # be views on an external buffer (see from_buffer), and suggestions are
+    # derived from the bitset on demand rather than stored.
+    #
+    # The bitset takes a bit per lexicon word, about 5 KB, against about 100
+    # bytes for everything else. With bitset=False it is left out and the
+    # candidates are filtered again, through the solve cache, when needed.
+    __slots__ = ('length', 'fingerprint', 'size', 'masks', 'counts', 'bitset')
+
+    def __init__(self, length=5, bitset=True):
+        word_index = load_index(length)
+        self.length = length
+        self.fingerprint = word_index.fingerprint
+        self.size = len(word_index)
+        self.masks = np.zeros(2 * length + 1, dtype=MASK_DTYPE)
+        self.counts = np.zeros((2, 26), dtype=np.uint8)
+        self.counts[1] = length
+        self.bitset = np.packbits(np.ones(self.size, dtype=bool), bitorder='little') if bitset else None
+
+    @property
+    def greens(self):
+        return self.masks[:self.length]
+
+    @property
+    def excluded(self):
+        return self.masks[self.length:2 * self.length]
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._arrays()) + HEADER.size
+
+    def _arrays(self):
+        if self.bitset is None:
+            return self.masks, self.counts
+        return self.masks, self.counts, self.bitset
+
+    def copy(self):
+        other = CompactState.__new__(CompactState)
+        other.length = self.length
+        other.fingerprint = self.fingerprint
+        other.size = self.size
+        other.masks = self.masks.copy()
+        other.counts = self.counts.copy()
+        other.bitset = None if self.bitset is None else self.bitset.copy()
+        return other
+
+    @classmethod
+    def from_solver(cls, solver, bitset=True):
+        state = cls(solver.length, bitset)
+        for pos, char in enumerate(solver.greens):
+            if char != '.':
+                state.greens[pos] = 1 << LETTERS.index(char)
+        for seq in solver.yellow_sequence:
+            for pos, char in enumerate(seq):
+                if char != '.':
+                    state.excluded[pos] |= 1 << LETTERS.index(char)
+        for char in solver.blacks:
+            state.masks[-1] |= 1 << LETTERS.index(char)
+        for char, n in solver.min_counts.items():
+            state.counts[0, LETTERS.index(char)] = n
+        for char, n in solver.max_counts.items():
+            state.counts[1, LETTERS.index(char)] = n
+        if bitset:
+            state._set_candidates(solver._candidates)
+        return state
+
+    def to_solver(self):
+        # Yellows come back as one sequence per excluded letter at the
+        # busiest position, which filters the same as the originals.
+        greens = ''.join(_letters(mask) or '.' for mask in self.greens)
+        excluded = [_letters(mask) for mask in self.excluded]
+        depth = max(len(letters) for letters in excluded)
+        yellows = [''.join(letters[i] if i < len(letters) else '.' for letters in excluded) for i in range(depth)]
+        solver = WordleSolver(greens, yellows, _letters(self.masks[-1]), self.length, max(5, depth))
+        for i, char in enumerate(LETTERS):
+            low, high = self.counts[:, i]
+            if low or high < self.length:
+                solver.add_count(char, int(low), int(high))
+        solver.solve()
+        return solver
+
+    def candidates(self):
+        if self.bitset is None:
+            return self._filter()
+        return np.flatnonzero(np.unpackbits(self.bitset, count=self.size, bitorder='little'))
+
+    def _set_candidates(self, candidates):
+        keep = np.zeros(self.size, dtype=bool)
+        keep[candidates] = True
+        self.bitset[:] = np.packbits(keep, bitorder='little')
+
+    @property
+    def search_space(self):
+        if self.bitset is None:
+            return len(self._filter())
+        return int(np.count_nonzero(np.unpackbits(self.bitset)))
+
+    def suggestions(self):
+        return Suggestions(load_index(self.length), self.candidates())
+
+    def add_guess(self, guess, colours):
+        # Same feedback rules as WordleSolver.add_guess(), applied to the
+        # masks in place, after which the bitset is narrowed.
+        assert len(guess) == self.length and len(colours) == self.length
+        found = {}
+        for char, colour in zip(guess, colours):
+            assert char in LETTERS and colour in 'gyb'
+            if colour != 'b':
+                found[char] = found.get(char, 0) + 1
+
+        for pos, (char, colour) in enumerate(zip(guess, colours)):
+            bit = 1 << LETTERS.index(char)
+            if colour == 'g':
+                self.greens[pos] = bit
+            elif colour == 'y' or char in found:
+                self.excluded[pos] |= bit
+        for char in set(guess):
+            column = LETTERS.index(char)
+            if char in found:
+                self.counts[0, column] = max(self.counts[0, column], found[char])
+                if any(c == char and colour == 'b' for c, colour in zip(guess, colours)):
+                    self.counts[1, column] = min(self.counts[1, column], found[char])
+            else:
+                self.masks[-1] |= 1 << column
+        coloured = np.bitwise_or.reduce(self.masks[:-1])
+        self.masks[-1] &= ~coloured
+        if self.bitset is not None:
+            self._set_candidates(self._filter(self.candidates()))
+
+    def _filter(self, subset=None):
+        # Shares results with WordleSolver.solve() through the solve cache.
+        word_index = load_index(self.length)
+        assert word_index.fingerprint == self.fingerprint, 'state belongs to a different lexicon'
+        key = f'{self.fingerprint}:{self.state_key()}'
+        candidates = solve_cache.get(key)
+        if candidates is None:
+            candidates = solve_cache.put(key, word_index.filter_masks(self.greens, self.excluded, self.masks[-1],
+                                                                      self.counts[0], self.counts[1], subset))
+        return candidates
+
+    def state_key(self):
+        # Matches WordleSolver.state_key(), so solve results and the opening
+        # book are shared with it.
+        greens = ''.join(_letters(mask) or '.' for mask in self.greens)
+        excluded = '/'.join(_letters(mask) for mask in self.excluded)
+        counts = ''
+        for i, char in enumerate(LETTERS):
+            low, high = self.counts[:, i]
+            if low <= max(greens.count(char), int(char in excluded)):
+                low = 0
+            if low or high < self.length:
+                counts += f'{char}{low}{high}'
+        return f'{greens}|{excluded}|{_letters(self.masks[-1])}|{counts}'
+
+    def recommend(self):
+        guess = opening_book(self.length).get(self.state_key())
+        if guess is None:
+            guesses, _ = recommender(self.length).best(self.candidates(), 1)
+            guess = str(load_index(self.length).words[guesses[0]])
+        return guess
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, self.length, self.bitset is not None, self.fingerprint.encode('ascii'), self.size)
+        return b''.join([header] + [array.tobytes() for array in self._arrays()])
+
+    def pack_into(self, buffer, offset=0):
+        # Writes the state into a writable buffer such as a bytearray, mmap
+        # or SharedMemory.buf; returns the offset just past it.
+        HEADER.pack_into(buffer, offset, MAGIC, self.length, self.bitset is not None,
+                         self.fingerprint.encode('ascii'), self.size)
+        offset += HEADER.size
+        for array in self._arrays():
+            np.frombuffer(buffer, np.uint8, array.nbytes, offset)[:] = array.reshape(-1).view(np.uint8)
+            offset += array.nbytes
+        return offset
+
+    @classmethod
+    def from_buffer(cls, buffer, offset=0):
+        # The arrays are views on buffer, not copies: add_guess() on a state
+        # read from a writable buffer updates it in place, while one read
+        # from bytes must be copy()'d first.
+        magic, length, bitset, fingerprint, size = HEADER.unpack_from(buffer, offset)
+        assert magic == MAGIC, 'not a packed solver state'
+        state = cls.__new__(cls)
+        state.length = length
+        state.fingerprint = fingerprint.decode('ascii')
+        state.size = size
+        offset += HEADER.size
+        state.masks = np.frombuffer(buffer, MASK_DTYPE, 2 * length + 1, offset)
+        offset += state.masks.nbytes
+        state.counts = np.frombuffer(buffer, np.uint8, 52, offset).reshape(2, 26)
+        offset += state.counts.nbytes
+        state.bitset = np.frombuffer(buffer, np.uint8, (size + 7) // 8, offset) if bitset else None
+        return state
+
+
+def _letters(mask):
+    return ''.join(char for i, char in enumerate(LETTERS) if int(mask) >> i & 1)
+
+
+def _solver_bytes(solver):
+    # Rough resident size of a WordleSolver, counting its candidate array.
+    size = sys.getsizeof(solver) + sys.getsizeof(solver.__dict__)
+    for value in solver.__dict__.values():
+        size += sys.getsizeof(value)
+        if isinstance(value, list):
+            size += sum(sys.getsizeof(item) for item in value)
+    return size + solver._candidates.nbytes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare compact and WordleSolver states over random games')
+    parser.add_argument('--games', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = list(load_index().words)
+    states = []
+    lean = []
+    solver_bytes = 0
+    for _ in range(args.games):
+        answer = rng.choice(words[:2500])
+        state = CompactState()
+        lean_state = CompactState(bitset=False)
+        solver = WordleSolver()
+        for guess in rng.sample(words, rng.randint(1, 4)):
+            colours = pattern_string(feedback(guess, answer))
+            state.add_guess(guess, colours)
+            lean_state.add_guess(guess, colours)
+            solver.add_guess(guess, colours)
+        solver.solve()
+        assert state.state_key() == solver.state_key()
+        assert np.array_equal(state.candidates(), solver._candidates)
+        solver_bytes += _solver_bytes(solver)
+        states.append(state)
+        lean.append(lean_state)
+
+    start = time.perf_counter()
+    packed = [state.to_bytes() for state in states]
+    pack_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    loaded = [CompactState.from_buffer(data) for data in packed]
+    load_seconds = time.perf_counter() - start
+    assert all(a.state_key() == b.state_key() for a, b in zip(states, loaded))
+
+    print(f'{args.games} games: {sum(map(len, packed)) / args.games:,.0f} bytes per packed state, '
+          f'{lean[0].nbytes} without the bitset, {solver_bytes / args.games:,.0f} bytes per WordleSolver')
+    print(f'to_bytes {pack_seconds / args.games * 1e6:.1f} us, from_buffer {load_seconds / args.games * 1e6:.1f} us')
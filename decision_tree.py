@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from batch import _pool_context
+from opening_book import KEY_VERSION
+from patterns import CACHE_DIR, pattern_string
+from wordle import WordleSolver, load_index, recommender
+
+TREE_PATH = os.path.join(CACHE_DIR, 'decision_tree.json')
+
+UNBOUNDED = 2**62
+
+
+class TreeSearch():
+    # Minimum total number of guesses needed to solve every answer of a set,
+    # by depth-first search over guesses with branch-and-bound. n answers take
+    # at least 2n - 1 guesses (one found straight away, the rest next turn),
+    # so the parts a guess splits a set into bound its cost before any of
+    # them is searched. Results are memoised on the set of answers, which
+    # many different guess sequences lead to.
+    def __init__(self, codes, words, answer_rows, green, beam=None):
+        # codes[answer, guess] is the feedback code of the pair, words the
+        # guess words and answer_rows maps each answer to its own guess.
+        # beam, if set, only tries that many guesses per set, which is faster
+        # but no longer guaranteed optimal.
+        self.codes = codes
+        self.words = words
+        self.answer_rows = answer_rows
+        self.green = green
+        self.beam = beam
+        self.offsets = np.arange(codes.shape[1], dtype=np.intp) * (green + 1)
+        self.exact = {}
+        self.lower = {}
+
+    def options(self, answers):
+        # Guesses that split the answers, in order of their lower bounds.
+        n = len(answers)
+        codes = self.codes[answers]
+        if n < 16:
+            ordered = np.sort(codes, axis=0)
+            distinct = 1 + (ordered[1:] != ordered[:-1]).sum(axis=0)
+        else:
+            # Sorting columns gets slow for large sets; mark (guess, code)
+            # pairs seen instead.
+            seen = np.zeros(len(self.offsets) * (self.green + 1), dtype=bool)
+            seen[(codes + self.offsets).ravel()] = True
+            distinct = np.count_nonzero(seen.reshape(len(self.offsets), -1), axis=1)
+        candidate = np.zeros(len(self.offsets), dtype=bool)
+        candidate[self.answer_rows[answers]] = True
+        parts = distinct - candidate
+        bounds = 3 * n - 2 * candidate - parts
+        useful = np.flatnonzero(candidate | (parts > 1))
+        order = useful[np.argsort(bounds[useful], kind='stable')][:self.beam]
+        return order, bounds[order]
+
+    def partition(self, answers, guess):
+        # Feedback code of each answer and the number of answers per code,
+        # leaving out the answer found by the guess itself.
+        column = self.codes[answers, guess]
+        sizes = np.bincount(column, minlength=self.green + 1)
+        sizes[self.green] = 0
+        return column, sizes
+
+    def split(self, answers, guess):
+        # (code, answers) for every feedback but all green.
+        column, sizes = self.partition(answers, guess)
+        return [(int(code), answers[column == code]) for code in np.flatnonzero(sizes)]
+
+    def cost(self, answers, guess, beta=UNBOUNDED):
+        # Total guesses with guess played first: exact if below beta,
+        # otherwise some value of at least beta. Parts of one or two answers
+        # always cost their bound; larger ones are searched largest first so
+        # that cutoffs come as early as possible.
+        n = len(answers)
+        column, sizes = self.partition(answers, guess)
+        total = n + 2 * sizes.sum() - np.count_nonzero(sizes)
+        large = np.flatnonzero(sizes > 2)
+        for code in large[np.argsort(-sizes[large], kind='stable')]:
+            if total >= beta:
+                break
+            low = 2 * sizes[code] - 1
+            total += self.solve(answers[column == code], beta - total + low) - low
+        return int(total)
+
+    def solve(self, answers, beta=UNBOUNDED):
+        # Same contract as cost(), minimised over every guess.
+        n = len(answers)
+        if n <= 2:
+            return 2 * n - 1
+        key = answers.tobytes()
+        if key in self.exact:
+            return self.exact[key][0]
+        if self.lower.get(key, 0) >= beta:
+            return self.lower[key]
+
+        best, best_guess = beta, None
+        guesses, bounds = self.options(answers)
+        for guess, bound in zip(guesses, bounds):
+            if bound >= best:
+                break
+            total = self.cost(answers, guess, best)
+            if total < best:
+                best, best_guess = total, guess
+
+        if best_guess is None:
+            self.lower[key] = beta
+            return beta
+        self.exact[key] = (best, int(best_guess))
+        return best
+
+    def choice(self, answers):
+        if len(answers) <= 2:
+            return self.answer_rows[answers[0]]
+        return self.exact[answers.tobytes()][1]
+
+    def book(self, answers, guess, solver, book):
+        # state_key() -> guess at every node below, found by replaying the
+        # feedback through a WordleSolver.
+        word = str(self.words[guess])
+        book[solver.state_key()] = word
+        for code, part in self.split(answers, guess):
+            child = solver.copy()
+            child.add_guess(word, pattern_string(code))
+            self.book(part, self.choice(part), child, book)
+        return book
+
+
+# Built in the parent and inherited by forked workers; workers started any
+# other way build their own.
+_search = None
+_best = None
+
+
+def build_search(answers=2500, guesses=12000, beam=None):
+    word_index = load_index()
+    rec = recommender()
+    answers = min(answers, len(rec.answers))
+    guesses = max(answers, min(guesses, len(rec.guesses)))
+    codes = np.ascontiguousarray(np.asarray(rec.matrix[:guesses, :answers]).T)
+    return TreeSearch(codes, word_index.words[rec.guesses[:guesses]],
+                      np.searchsorted(rec.guesses, rec.answers[:answers]), 3**word_index.length - 1, beam)
+
+
+def _init_worker(best, answers, guesses, beam):
+    global _search, _best
+    if _search is None:
+        _search = build_search(answers, guesses, beam)
+    _best = best
+
+
+def _search_opening(guess, bound):
+    # The best total found by any worker so far bounds every other opening.
+    # Returns the book only for a new best.
+    answers = np.arange(len(_search.codes))
+    beta = _best.value
+    if bound >= beta:
+        return int(guess), None, None
+    total = _search.cost(answers, guess, beta)
+    if total >= beta:
+        return int(guess), None, None
+    with _best.get_lock():
+        if total >= _best.value:
+            return int(guess), None, None
+        _best.value = total
+    solver = WordleSolver(max_yellows=len(answers))
+    return int(guess), total, _search.book(answers, guess, solver, {})
+
+
+def search_openings(answers=2500, guesses=12000, beam=None, openings=None, workers=None):
+    # Yields (guess, total, book) per opening as they finish; total and book
+    # are None for openings that cannot beat the best so far.
+    global _search
+    rec = recommender()
+    _search = build_search(answers, guesses, beam)
+
+    candidates, bounds = _search.options(np.arange(len(_search.codes)))
+    context = _pool_context()
+    best = context.Value('q', UNBOUNDED)
+    if workers == 1:
+        _init_worker(best, answers, guesses, beam)
+        for guess, bound in zip(candidates[:openings], bounds):
+            yield (rec.guesses[guess],) + _search_opening(guess, bound)[1:]
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(best, answers, guesses, beam)) as pool:
+        for guess, total, book in pool.map(_search_opening, candidates[:openings], bounds[:openings]):
+            yield rec.guesses[guess], total, book
+
+
+def load_tree(fingerprint, path=TREE_PATH):
+    from opening_book import load_book
+    return load_book(fingerprint, path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Search for the decision tree with the fewest expected guesses')
+    parser.add_argument('--answers', type=int, default=2500, help='size of the answer list')
+    parser.add_argument('--guesses', type=int, default=12000, help='size of the guess list')
+    parser.add_argument('--beam', type=int, default=None,
+                        help='only try the N most promising guesses per node; fast, but not provably optimal')
+    parser.add_argument('--openings', type=int, default=None, help='only try the N most promising openings')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', default=TREE_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    words = load_index().words
+    best = None
+    for guess, total, book in search_openings(args.answers, args.guesses, args.beam, args.openings, args.workers):
+        # Workers finish in any order, so a later result can still be worse.
+        if total is None or (best is not None and total >= best[1]):
+            continue
+        best = (guess, total, book)
+        print(f'{words[guess]}: {total} guesses, {total / args.answers:.4f} per answer '
+              f'({time.perf_counter() - start:.0f}s)')
+
+    guess, total, book = best
+    answers = min(args.answers, len(recommender().answers))
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    tmp = f'{args.out}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'fingerprint': load_index().fingerprint, 'version': KEY_VERSION, 'answers': answers,
+                   'guesses': args.guesses, 'beam': args.beam, 'openings': args.openings, 'total': total, 'book': book},
+                  f, separators=(',', ':'))
+    os.replace(tmp, args.out)
+    print(f'Best opening {words[guess]}: {total / answers:.4f} guesses per answer; '
+          f'wrote {len(book)} positions to {args.out} in {time.perf_counter() - start:.1f}s')
@@ -0,0 +1,222 @@
+import argparse
+import csv
+import gzip
+import heapq
+import io
+import json
+import os
+import string
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_CSV = os.path.join(BASE_DIR, 'unigram_freq.csv')
+LEXICON_PATH = os.path.join(BASE_DIR, '.cache', 'lexicon.npy')
+
+# A source is either a frequency table ({'path': ...} plus optional weight,
+# word_column, freq_column and delimiter) or a plain word list corpus.
+DEFAULT_SOURCES = [{'path': SOURCE_CSV}, {'corpus': 'nltk'}]
+
+# Bump when the layout or ordering of the lexicon file changes.
+FORMAT_VERSION = 3
+
+
+def lexicon_dtype(length=5):
+    return np.dtype([('word', f'S{length}'), ('freq', '<f8')])
+
+
+LEXICON_DTYPE = lexicon_dtype()
+
+
+def lexicon_path(length=5):
+    # One lexicon per word length; the 5-letter one keeps its original name.
+    if length == 5:
+        return LEXICON_PATH
+    return os.path.join(BASE_DIR, '.cache', f'lexicon-{length}.npy')
+
+
+def _stamp(source):
+    if 'path' not in source:
+        return dict(source)
+    stat = os.stat(source['path'])
+    return {**source, 'path': os.path.abspath(source['path']), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+def _is_word(word, length=5):
+    return len(word) == length and all(char in string.ascii_lowercase for char in word)
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path), encoding='utf-8', errors='replace', newline='')
+    return open(path, encoding='utf-8', errors='replace', newline='')
+
+
+def read_table(path, word_column=0, freq_column=1, delimiter=None):
+    # Streams (word, freq) rows from a csv/tsv file, gzipped or not. Rows
+    # whose frequency is not a number, such as headers, are skipped.
+    if delimiter is None:
+        name = path[:-3] if path.endswith('.gz') else path
+        delimiter = '\t' if name.endswith(('.tsv', '.tab')) else ','
+    with _open_text(path) as f:
+        for row in csv.reader(f, delimiter=delimiter):
+            if len(row) <= max(word_column, freq_column):
+                continue
+            try:
+                freq = float(row[freq_column])
+            except ValueError:
+                continue
+            yield row[word_column].strip().lower(), freq
+
+
+def read_corpus(name):
+    # Word lists without frequencies; NLTK is only needed when building.
+    if name != 'nltk':
+        raise ValueError(f'unknown corpus {name!r}')
+    try:
+        from nltk.corpus import words as dictionary
+        for word in dictionary.words():
+            yield word.lower(), None
+    except (ImportError, LookupError):
+        return
+
+
+def read_source(source):
+    if 'corpus' in source:
+        return read_corpus(source['corpus'])
+    return read_table(source['path'], source.get('word_column', 0), source.get('freq_column', 1),
+                      source.get('delimiter'))
+
+
+def _prune(freqs, max_words):
+    return dict(heapq.nlargest(max_words, freqs.items(),
+                               key=lambda item: -1.0 if item[1] is None else item[1]))
+
+
+def ingest(sources, length=5, max_words=None):
+    # Merges the sources one row at a time into {word: weighted freq}, keeping
+    # only words of the target length. Frequencies are summed across rows and
+    # sources after scaling by each source's weight; words only seen in word
+    # lists map to None. With max_words set the table is cut back to the most
+    # frequent max_words whenever it doubles, which bounds memory for huge
+    # dumps at the cost of approximate counts for rare words.
+    freqs = {}
+    for source in sources:
+        weight = source.get('weight', 1.0)
+        for word, freq in read_source(source):
+            if not _is_word(word, length):
+                continue
+            if freq is None:
+                freqs.setdefault(word, None)
+            else:
+                freqs[word] = (freqs.get(word) or 0.0) + weight * freq
+            if max_words is not None and len(freqs) > 2 * max_words:
+                freqs = _prune(freqs, max_words)
+
+    if max_words is not None and len(freqs) > max_words:
+        freqs = _prune(freqs, max_words)
+    return freqs
+
+
+def write_lexicon(freqs, path=LEXICON_PATH, length=5, meta=None):
+    # Fixed-width array in frequency rank order, so a word's position is its
+    # rank. Words without a frequency get NaN and sort last.
+    ranked = sorted(freqs.items(), key=lambda item: (item[1] is None, -(item[1] or 0.0), item[0]))
+    lexicon = np.empty(len(ranked), dtype=lexicon_dtype(length))
+    lexicon['word'] = [word for word, _ in ranked]
+    lexicon['freq'] = [np.nan if freq is None else freq for _, freq in ranked]
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        np.save(f, lexicon)
+    os.replace(tmp, path)
+    if meta is not None:
+        with open(_meta_path(path), 'w') as f:
+            json.dump(meta, f)
+
+    return lexicon
+
+
+def build_lexicon(sources=DEFAULT_SOURCES, path=LEXICON_PATH, length=5, max_words=None):
+    # The sources and their file stamps are recorded next to the lexicon so it
+    # can be rebuilt the same way when one of them changes.
+    meta = {'version': FORMAT_VERSION, 'length': length, 'max_words': max_words,
+            'sources': [_stamp(source) for source in sources]}
+    return write_lexicon(ingest(sources, length, max_words), path, length, meta)
+
+
+def _recipe(path):
+    try:
+        with open(_meta_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_stale(path=LEXICON_PATH):
+    meta = _recipe(path)
+    if meta is None or meta.get('version') != FORMAT_VERSION or not os.path.exists(path):
+        return True
+    try:
+        return any(_stamp(_source(source)) != source for source in meta['sources'])
+    except OSError:
+        return True
+
+
+def _source(stamped):
+    return {key: value for key, value in stamped.items() if key not in ('mtime_ns', 'size')}
+
+
+def load_lexicon(path=LEXICON_PATH, length=5):
+    # Memory-mapped, so worker processes share the pages with each other.
+    # A stale lexicon is rebuilt from the sources it was built from, or from
+    # the defaults for the given word length if there is no usable record of
+    # them. If one of the recorded sources has gone, e.g. a deleted --source
+    # file or a moved checkout, the existing lexicon is kept as it is.
+    if is_stale(path):
+        meta = _recipe(path)
+        if meta is not None and meta.get('version') == FORMAT_VERSION:
+            sources = [_source(source) for source in meta['sources']]
+            if all('path' not in source or os.path.exists(source['path']) for source in sources):
+                build_lexicon(sources, path, meta['length'], meta['max_words'])
+            elif not os.path.exists(path):
+                build_lexicon(path=path, length=length)
+        else:
+            build_lexicon(path=path, length=length)
+    return np.load(path, mmap_mode='r')
+
+
+def _parse_source(arg):
+    path, _, weight = arg.partition('@')
+    return {'path': path, 'weight': float(weight or 1.0)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the solver lexicon from frequency tables')
+    parser.add_argument('--source', action='append', type=_parse_source, default=[], metavar='PATH[@WEIGHT]',
+                        help='csv/tsv frequency table, optionally gzipped; repeatable')
+    parser.add_argument('--word-column', type=int, default=0, help='applies to every --source')
+    parser.add_argument('--freq-column', type=int, default=1, help='applies to every --source')
+    parser.add_argument('--delimiter', default=None, help='default: tab for .tsv/.tab files, else comma')
+    parser.add_argument('--no-nltk', action='store_true', help='leave out the NLTK word list')
+    parser.add_argument('--length', type=int, default=5)
+    parser.add_argument('--max-words', type=int, default=None, help='bound memory by keeping the top N words')
+    parser.add_argument('--out', default=None, help='default: the solver lexicon for --length')
+    args = parser.parse_args()
+
+    sources = []
+    for source in args.source or [{'path': SOURCE_CSV}]:
+        source.update(word_column=args.word_column, freq_column=args.freq_column)
+        if args.delimiter is not None:
+            source['delimiter'] = args.delimiter
+        sources.append(source)
+    if not args.no_nltk:
+        sources.append({'corpus': 'nltk'})
+
+    out = args.out or lexicon_path(args.length)
+    lexicon = build_lexicon(sources, out, args.length, args.max_words)
+    print(f'Wrote {len(lexicon)} words to {out}')
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+import numpy as np
+from batch import random_state
+from wordle import load_index
+
+
+async def post(reader, writer, host, body):
+    writer.write(f'POST /solve HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+                 f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(url, bodies, latencies, errors):
+    # One keep-alive connection working through its share of the requests.
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            status = await post(reader, writer, parts.netloc, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(url, requests, concurrency, distinct, recommend, seed):
+    # distinct caps the number of different states so repeated ones exercise
+    # request coalescing and the solve cache.
+    rng = random.Random(seed)
+    words = list(load_index().words)
+    states = [random_state(rng, words, rng.randint(0, 4)) for _ in range(distinct)]
+    bodies = []
+    for _ in range(requests):
+        greens, yellows, blacks = rng.choice(states)
+        bodies.append(json.dumps({'greens': greens, 'yellows': yellows, 'blacks': blacks,
+                                  'recommend': recommend}).encode())
+
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(url, bodies[i::concurrency], latencies, errors) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    print(f'{requests} requests, {concurrency} connections, {distinct} distinct states')
+    print(f'{elapsed:.2f}s, {requests / elapsed:,.0f} req/s, {len(errors)} errors')
+    print(f'latency p50 {p50:.2f} ms, p90 {p90:.2f} ms, p99 {p99:.2f} ms')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test a running server.py instance')
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--distinct', type=int, default=200)
+    parser.add_argument('--recommend', action='store_true', help='also ask for an entropy recommendation')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.requests, args.concurrency, args.distinct, args.recommend, args.seed))
@@ -0,0 +1,99 @@
+import argparse
+import random
+import time
+import numpy as np
+from patterns import pattern_string, feedback
+from wordle import WordleSolver, load_index, opening_book, recommender
+
+
+class MultiBoardSolver():
+    # Quordle/Octordle style: several boards with their own answers, all fed
+    # the same guesses. Each board keeps its own constraints, while guesses
+    # are scored once across all of them.
+    def __init__(self, boards=4, length=5, max_guesses=None):
+        self.length = length
+        self.max_guesses = boards + 5 if max_guesses is None else max_guesses
+        self.boards = [WordleSolver(length=length, max_yellows=self.max_guesses) for _ in range(boards)]
+        self.solved = [False] * boards
+        self.guesses = []
+
+    def open_boards(self):
+        return [board for board, solved in zip(self.boards, self.solved) if not solved]
+
+    def add_guess(self, guess, colours):
+        # colours has one g/y/b string per board; entries for boards that are
+        # already solved are ignored.
+        assert len(colours) == len(self.boards)
+        self.guesses.append(guess)
+        for i, (board, board_colours) in enumerate(zip(self.boards, colours)):
+            if self.solved[i]:
+                continue
+            if board_colours == 'g' * self.length:
+                self.solved[i] = True
+                continue
+            board.add_guess(guess, board_colours)
+            board.solve()
+
+    def recommend(self):
+        boards = [board for board in self.open_boards() if board.search_space]
+        if not boards:
+            return None
+
+        # A board down to one word is worth finishing straight away.
+        words = load_index(self.length).words
+        for board in boards:
+            if board.search_space == 1 and words[board._candidates[0]] not in self.guesses:
+                return str(words[board._candidates[0]])
+
+        # Boards that have all seen the same feedback, as at the start, can
+        # share the single board opening book.
+        keys = set(board.state_key() for board in boards)
+        if len(keys) == 1:
+            guess = opening_book(self.length).get(keys.pop())
+            if guess is not None:
+                return guess
+
+        guesses, _ = recommender(self.length).best_combined([board._candidates for board in boards], 1)
+        return str(words[guesses[0]])
+
+
+def play(targets, max_guesses=None):
+    solver = MultiBoardSolver(len(targets), len(targets[0]), max_guesses)
+    latencies = []
+    while not all(solver.solved) and len(solver.guesses) < solver.max_guesses:
+        start = time.perf_counter()
+        guess = solver.recommend()
+        latencies.append(time.perf_counter() - start)
+        if guess is None:
+            break
+        solver.add_guess(guess, [pattern_string(feedback(guess, target), solver.length) for target in targets])
+
+    return {
+        'targets': targets,
+        'solved': all(solver.solved),
+        'guesses': solver.guesses,
+        'recommend_seconds': latencies,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play simulated Quordle/Octordle games')
+    parser.add_argument('--boards', type=int, default=4, help='4 for Quordle, 8 for Octordle')
+    parser.add_argument('--length', type=int, default=5)
+    parser.add_argument('--max-guesses', type=int, default=None, help='default: boards + 5')
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--answers', type=int, default=2500, help='size of the answer list')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    answers = list(load_index(args.length).words[:args.answers])
+    games = [play(rng.sample(answers, args.boards), args.max_guesses) for _ in range(args.games)]
+
+    solved = [game for game in games if game['solved']]
+    latencies = [t for game in games for t in game['recommend_seconds']]
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f'{len(solved)}/{len(games)} solved with {args.boards} boards')
+    if solved:
+        print(f"average {np.mean([len(game['guesses']) for game in solved]):.3f} guesses")
+    print(f'recommend p50 {p50:.1f} ms, p99 {p99:.1f} ms, max {max(latencies) * 1000:.1f} ms')
@@ -0,0 +1,58 @@
+import json
+import os
+import time
+from patterns import CACHE_DIR, pattern_matrix, pattern_string
+from wordle import WordleSolver, load_index, recommender
+
+BOOK_PATH = os.path.join(CACHE_DIR, 'opening_book.json')
+
+# Bump when WordleSolver.state_key() changes, which invalidates stored keys.
+KEY_VERSION = 2
+
+
+def build_book(path=BOOK_PATH):
+    # Recommended guess for the empty state and for the state after every
+    # feedback pattern the opening guess can produce, keyed by state_key().
+    word_index = load_index()
+    solver = WordleSolver()
+    guesses, _ = recommender().best(solver._candidates, 1)
+    opening = str(word_index.words[guesses[0]])
+    book = {solver.state_key(): opening}
+
+    codes = sorted(set(pattern_matrix([opening], list(word_index.words), word_index.length)[0].tolist()))
+    for code in codes:
+        solver = WordleSolver()
+        colours = pattern_string(code)
+        if colours == 'ggggg':
+            continue
+        solver.add_guess(opening, colours)
+        solver.solve()
+        guesses, _ = recommender().best(solver._candidates, 1)
+        book[solver.state_key()] = str(word_index.words[guesses[0]])
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump({'fingerprint': word_index.fingerprint, 'version': KEY_VERSION, 'book': book}, f,
+                  separators=(',', ':'))
+    os.replace(tmp, path)
+    return book
+
+
+def load_book(fingerprint, path=BOOK_PATH):
+    # A book built from a different lexicon or with older state keys is
+    # ignored rather than trusted.
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('fingerprint') != fingerprint or data.get('version') != KEY_VERSION:
+        return {}
+    return data['book']
+
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    book = build_book()
+    print(f'Wrote {len(book)} positions to {BOOK_PATH} in {time.perf_counter() - start:.1f}s')
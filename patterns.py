@@ -0,0 +1,188 @@
+import hashlib
+import os
+import numpy as np
+
+BLACK, YELLOW, GREEN = 0, 1, 2
+COLOURS = 'byg'
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+
+def encode(words, length=5):
+    # (n, length) array of letter codes 0-25; length is given rather than
+    # read off the words so that an empty list keeps its shape.
+    joined = ''.join(words).encode('ascii')
+    return (np.frombuffer(joined, dtype=np.uint8).reshape(-1, length) - ord('a')).astype(np.uint8)
+
+
+def feedback(guess, answer):
+    # Wordle colouring of guess against answer as a base-3 code, position 0
+    # being the least significant digit.
+    colours = [BLACK] * len(guess)
+    unmatched = {}
+    for pos, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            colours[pos] = GREEN
+        else:
+            unmatched[a] = unmatched.get(a, 0) + 1
+    for pos, g in enumerate(guess):
+        if colours[pos] != GREEN and unmatched.get(g, 0) > 0:
+            colours[pos] = YELLOW
+            unmatched[g] -= 1
+
+    return sum(colour * 3**pos for pos, colour in enumerate(colours))
+
+
+def pattern_string(code, length=5):
+    chars = ''
+    for _ in range(length):
+        chars += COLOURS[code % 3]
+        code //= 3
+    return chars
+
+
+def pattern_code(chars):
+    return sum(COLOURS.index(char) * 3**pos for pos, char in enumerate(chars))
+
+
+def pattern_dtype(length=5):
+    # Smallest unsigned type holding all 3**length codes.
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if 3**length <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def pattern_matrix(guesses, answers, length=5, chunk=256):
+    # Feedback code for every guess/answer pair, computed in blocks of guesses.
+    # A non-green guess letter is yellow while fewer earlier non-green copies
+    # of it have been seen than the answer has unmatched copies.
+    g_codes = encode(guesses, length)
+    a_codes = encode(answers, length)
+    a_counts = np.zeros((len(answers), 26), dtype=np.int8)
+    for pos in range(length):
+        np.add.at(a_counts, (np.arange(len(answers)), a_codes[:, pos]), 1)
+
+    dtype = pattern_dtype(length)
+    matrix = np.empty((len(guesses), len(answers)), dtype=dtype)
+    for start in range(0, len(guesses), chunk):
+        block = g_codes[start:start + chunk]
+        green = block[:, None, :] == a_codes[None, :, :]
+        same = block[:, :, None] == block[:, None, :]
+        codes = np.zeros(green.shape[:2], dtype=dtype)
+        for pos in range(length):
+            letter_green = (green & same[:, pos, None, :]).sum(axis=2, dtype=np.int8)
+            available = a_counts[:, block[:, pos]].T - letter_green
+            seen = (~green[:, :, :pos] & same[:, pos, None, :pos]).sum(axis=2, dtype=np.int8)
+            yellow = ~green[:, :, pos] & (seen < available)
+            codes += (GREEN * green[:, :, pos] + YELLOW * yellow).astype(dtype) * dtype.type(3**pos)
+        matrix[start:start + chunk] = codes
+
+    return matrix
+
+
+def load_pattern_matrix(guesses, answers, length=5, cache_dir=CACHE_DIR):
+    # The matrix only depends on the two word lists, so it is keyed on them
+    # and memory-mapped on later loads.
+    key = hashlib.sha1(('\n'.join(guesses) + '\0' + '\n'.join(answers)).encode('ascii')).hexdigest()[:16]
+    path = os.path.join(cache_dir, f'patterns-{key}.npy')
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r')
+
+    matrix = pattern_matrix(guesses, answers, length)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        np.save(f, matrix)
+    os.replace(tmp, path)
+    return matrix
+
+
+def entropies(matrix, columns=None, length=5, chunk=1024):
+    # Expected information (bits) of each guess row over the answer columns,
+    # H = log2(n) - sum(c * log2(c)) / n over the pattern counts c. chunk is
+    # the number of rows per block for 5 letters, and shrinks as the number
+    # of patterns grows to keep the count table the same size.
+    if columns is not None and len(columns) < matrix.shape[1]:
+        matrix = matrix[:, columns]
+    rows, n = matrix.shape
+    scores = np.zeros(rows)
+    if n == 0:
+        return scores
+
+    patterns = 3**length
+    chunk = max(1, chunk * 243 // patterns)
+    c_log_c = np.arange(n + 1, dtype=float)
+    c_log_c[1:] *= np.log2(c_log_c[1:])
+    for start in range(0, rows, chunk):
+        block = np.asarray(matrix[start:start + chunk], dtype=np.intp)
+        block += np.arange(len(block), dtype=np.intp)[:, None] * patterns
+        counts = np.bincount(block.ravel(), minlength=len(block) * patterns).reshape(len(block), patterns)
+        scores[start:start + chunk] = np.log2(n) - c_log_c[counts].sum(axis=1) / n
+
+    return scores
+
+
+class GuessRecommender():
+    # Ranks guesses by the expected information of their feedback over the
+    # current candidates. Guesses come from the guess_pool most frequent words
+    # and the cached matrix covers the answer_pool most frequent words, which
+    # stand in for the likely answers.
+    def __init__(self, words, freq, guess_pool=12000, answer_pool=2500, cache_dir=CACHE_DIR):
+        self.words = words
+        self.length = words.dtype.itemsize // 4
+        self.freq = np.nan_to_num(np.asarray(freq, dtype=float), nan=-1.0)
+        self.rank = np.empty(len(words), dtype=np.intp)
+        self.rank[np.argsort(-self.freq, kind='stable')] = np.arange(len(words))
+        self.answer_pool = answer_pool
+        self.guesses = np.flatnonzero(self.rank < guess_pool)
+        self.answers = np.flatnonzero(self.rank < answer_pool)
+        self.matrix = load_pattern_matrix(list(words[self.guesses]), list(words[self.answers]), self.length,
+                                          cache_dir)
+        self.answer_column = np.full(len(words), -1, dtype=np.intp)
+        self.answer_column[self.answers] = np.arange(len(self.answers))
+
+    def scores(self, candidates):
+        return self.combined_scores([candidates])
+
+    def combined_scores(self, candidate_sets):
+        # Summed expected information over several boards that share guesses,
+        # treating their answers as independent. Every board reads the same
+        # cached matrix and boards with identical candidates are scored once.
+        scores = np.zeros(len(self.guesses))
+        scored = {}
+        fallback = []
+        for candidates in candidate_sets:
+            if not len(candidates):
+                # Nothing left to tell apart on this board.
+                continue
+            key = candidates.tobytes()
+            if key not in scored:
+                columns = self.answer_column[candidates]
+                columns = columns[columns >= 0]
+                if not len(columns):
+                    # None of the candidates is a likely answer: score against
+                    # the most frequent of them directly instead.
+                    fallback.append(candidates[np.argsort(self.rank[candidates])[:self.answer_pool]])
+                    continue
+                scored[key] = entropies(self.matrix, columns, self.length)
+            scores += scored[key]
+
+        if fallback:
+            # One block of patterns over the union serves all such boards.
+            union = np.unique(np.concatenate(fallback))
+            matrix = pattern_matrix(list(self.words[self.guesses]), list(self.words[union]), self.length)
+            for candidates in fallback:
+                scores += entropies(matrix, np.searchsorted(union, candidates), self.length)
+        return scores
+
+    def best(self, candidates, n=10):
+        return self.best_combined([candidates], n)
+
+    def best_combined(self, candidate_sets, n=10):
+        # Ties go to guesses that could still be the answer on some board,
+        # then to frequency.
+        scores = self.combined_scores(candidate_sets)
+        is_candidate = np.isin(self.guesses, np.concatenate(candidate_sets))
+        order = np.lexsort((self.rank[self.guesses], ~is_candidate, -scores))[:n]
+        return self.guesses[order], scores[order]
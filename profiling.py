@@ -0,0 +1,131 @@
+import json
+import math
+import time
+
+# The active sink, or None. Instrumented code checks this through clock(),
+# so with profiling disabled a stage costs one call and a comparison.
+sink = None
+
+
+def enable(new_sink):
+    global sink
+    sink = new_sink
+    return new_sink
+
+
+def disable():
+    global sink
+    sink = None
+
+
+def clock():
+    return time.perf_counter() if sink is not None else None
+
+
+def record(stage, started, **fields):
+    # fields are small facts about the stage, e.g. n_in/n_out candidate
+    # counts or hit=True for cache lookups.
+    if started is not None and sink is not None:
+        sink.record(stage, time.perf_counter() - started, fields)
+
+
+class HistogramSink():
+    # In-process per-stage histograms with power-of-two microsecond buckets.
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+
+    def record(self, stage, seconds, fields):
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = {'count': 0, 'seconds': 0.0, 'max': 0.0, 'buckets': {},
+                                          'n_in': 0, 'n_out': 0}
+        stats['count'] += 1
+        stats['seconds'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        bucket = max(0, math.ceil(math.log2(max(seconds * 1e6, 1))))
+        stats['buckets'][bucket] = stats['buckets'].get(bucket, 0) + 1
+        stats['n_in'] += fields.get('n_in', 0)
+        stats['n_out'] += fields.get('n_out', 0)
+        for name, value in fields.items():
+            if isinstance(value, bool):
+                counter = f'{stage}.{name}' if value else f'{stage}.not_{name}'
+                self.counters[counter] = self.counters.get(counter, 0) + 1
+
+    def percentile(self, stage, q):
+        # Upper bound, in seconds, of the bucket holding the q-th percentile.
+        stats = self.stages[stage]
+        target = q / 100 * stats['count']
+        seen = 0
+        for bucket in sorted(stats['buckets']):
+            seen += stats['buckets'][bucket]
+            if seen >= target:
+                return 2**bucket / 1e6
+        return stats['max']
+
+    def summary(self):
+        return {
+            'stages': {stage: {'count': stats['count'],
+                               'mean': stats['seconds'] / stats['count'],
+                               'p50': self.percentile(stage, 50),
+                               'p99': self.percentile(stage, 99),
+                               'max': stats['max'],
+                               'mean_n_in': stats['n_in'] / stats['count'],
+                               'mean_n_out': stats['n_out'] / stats['count']}
+                       for stage, stats in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+
+    def report(self):
+        lines = [f"{'stage':<28}{'count':>8}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}{'in':>10}{'out':>10}"]
+        for stage, stats in sorted(self.summary()['stages'].items()):
+            lines.append(f"{stage:<28}{stats['count']:>8}{stats['mean'] * 1e6:>10.1f}{stats['p50'] * 1e6:>10.0f}"
+                         f"{stats['p99'] * 1e6:>10.0f}{stats['mean_n_in']:>10.0f}{stats['mean_n_out']:>10.0f}")
+        for counter, value in sorted(self.counters.items()):
+            lines.append(f'{counter:<28}{value:>8}')
+        return '\n'.join(lines)
+
+
+class JsonLinesSink():
+    # Appends one JSON object per stage to a file, for offline analysis.
+    def __init__(self, path):
+        self.file = open(path, 'a', buffering=1)
+
+    def record(self, stage, seconds, fields):
+        self.file.write(json.dumps({'time': time.time(), 'stage': stage, 'seconds': seconds, **fields}) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class TeeSink():
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def record(self, stage, seconds, fields):
+        for sink in self.sinks:
+            sink.record(stage, seconds, fields)
+
+
+if __name__ == '__main__':
+    import argparse
+    # Enable through the imported module: the solver checks profiling.sink,
+    # not this script's __main__ namespace.
+    import profiling
+    from simulate import answer_list, play
+
+    parser = argparse.ArgumentParser(description='Profile solver stages over simulated games')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--policy', choices=['freq', 'entropy'], default='freq')
+    parser.add_argument('--jsonl', default=None, help='also write every stage to this file')
+    args = parser.parse_args()
+
+    histograms = profiling.HistogramSink()
+    if args.jsonl:
+        profiling.enable(profiling.TeeSink(histograms, profiling.JsonLinesSink(args.jsonl)))
+    else:
+        profiling.enable(histograms)
+
+    for target in answer_list()[:args.games]:
+        play(target, args.policy)
+    print(histograms.report())
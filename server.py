@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from batch import _pool_context
+from wordle import WordleSolver, load_index
+
+MAX_BODY = 64 * 1024
+MAX_SUGGESTIONS = 100
+
+
+def solver_from_request(request):
+    # Either an explicit constraint state or a guess history of
+    # [guess, colours] pairs, see WordleSolver.add_guess().
+    if 'guesses' in request:
+        solver = WordleSolver()
+        for guess, colours in request['guesses']:
+            assert isinstance(guess, str) and isinstance(colours, str)
+            solver.add_guess(guess.lower(), colours.lower())
+    else:
+        # Yellows go through add_yellow() so each sequence is validated.
+        solver = WordleSolver(request.get('greens', '.....'))
+        for seq in request.get('yellows', []):
+            solver.add_yellow(seq)
+        solver.blacks = request.get('blacks', '')
+    counts = request.get('counts', {})
+    assert isinstance(counts, dict)
+    for char, (minimum, maximum) in counts.items():
+        solver.add_count(char, minimum, maximum)
+    return solver
+
+
+def solve_request(request):
+    # Runs in the executor; everything CPU bound happens here.
+    n = int(request.get('n', 10))
+    assert n >= 0
+    solver = solver_from_request(request)
+    solver.solve()
+    # Words without a frequency have NaN, which is not valid JSON.
+    suggestions = [(word, None if math.isnan(freq) else freq)
+                   for word, freq in solver.word_suggestions.top(min(n, MAX_SUGGESTIONS))]
+    response = {
+        'state': solver.state_key(),
+        'search_space': solver.search_space,
+        'suggestions': suggestions,
+    }
+    if request.get('recommend'):
+        response['recommendation'] = solver.recommend()
+    return response
+
+
+class SolverService():
+    def __init__(self, executor):
+        self.executor = executor
+        self.in_flight = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    async def solve(self, request):
+        # Identical requests already being solved share the pending result.
+        key = json.dumps(request, sort_keys=True, separators=(',', ':'))
+        self.requests += 1
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, solve_request, request)
+        self.in_flight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'in_flight': len(self.in_flight),
+        }
+
+    async def route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return HTTPStatus.OK, {'ok': True, 'stats': self.stats()}
+        if path != '/solve':
+            return HTTPStatus.NOT_FOUND, {'error': 'unknown path'}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'use POST'}
+
+        try:
+            request = json.loads(body)
+            assert isinstance(request, dict)
+        except (ValueError, AssertionError):
+            return HTTPStatus.BAD_REQUEST, {'error': 'body must be a JSON object'}
+        try:
+            return HTTPStatus.OK, await self.solve(request)
+        except (AssertionError, TypeError, ValueError, KeyError):
+            # The solver's validation rejected the request.
+            return HTTPStatus.BAD_REQUEST, {'error': 'invalid solver state'}
+        except Exception:
+            # Anything else, e.g. a broken worker pool, is the server's fault.
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'internal error'}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                # Without a usable length the body cannot be skipped either,
+                # so the connection is closed after answering.
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, payload = HTTPStatus.BAD_REQUEST, {'error': 'invalid content-length'}
+                    keep_alive = False
+                elif length > MAX_BODY:
+                    status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'body too large'}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.route(method, path, body)
+                    keep_alive = (headers.get('connection', '').lower() != 'close'
+                                  and version == 'HTTP/1.1')
+
+                data = json.dumps(payload, allow_nan=False).encode()
+                writer.write(f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                             f'Content-Type: application/json\r\n'
+                             f'Content-Length: {len(data)}\r\n'
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host='127.0.0.1', port=8080, workers=None):
+    # The index is loaded before the pool forks so every worker shares it.
+    load_index()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(), initializer=load_index) as executor:
+        service = SolverService(executor)
+        server = await asyncio.start_server(service.handle, host, port)
+        print(f'Serving on http://{host}:{port}')
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='HTTP/JSON Wordle solver service')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
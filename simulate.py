@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from batch import _pool_context
+from patterns import pattern_string, feedback
+from wordle import WordleSolver, load_index, solve_cache
+
+MAX_TURNS = 6
+
+
+def answer_list(size=2500):
+    # The most frequent lexicon words stand in for the answer list.
+    return list(load_index().words[:size])
+
+
+def next_guess(solver, policy, guessed):
+    if policy == 'entropy':
+        guess = solver.recommend()
+        if guess not in guessed:
+            return guess
+        options = solver.best_guesses(len(guessed) + 1)['guess']
+    else:
+        options = [word for word, _ in solver.word_suggestions.top(len(guessed) + 1)]
+    for guess in options:
+        if guess not in guessed:
+            return guess
+    return None
+
+
+def play(target, policy='freq', max_turns=MAX_TURNS, cold=True):
+    # cold empties the solve cache first, so that solve_seconds times the
+    # filtering rather than lookups of states earlier games already solved.
+    if cold:
+        solve_cache.clear()
+    guesses = []
+    latencies = []
+    solved = False
+
+    start = time.perf_counter()
+    solver = WordleSolver()
+    latencies.append(time.perf_counter() - start)
+    for turn in range(max_turns):
+        if turn:
+            start = time.perf_counter()
+            solver.solve()
+            latencies.append(time.perf_counter() - start)
+
+        guess = next_guess(solver, policy, guesses)
+        if guess is None:
+            break
+        guesses.append(guess)
+        if guess == target:
+            solved = True
+            break
+        solver.add_guess(guess, pattern_string(feedback(guess, target)))
+
+    return {
+        'target': target,
+        'solved': solved,
+        'guesses': guesses,
+        'solve_seconds': latencies,
+        'search_space_hist': solver.search_space_hist,
+    }
+
+
+def _play_chunk(targets, policy, cold=True):
+    return [play(target, policy, cold=cold) for target in targets]
+
+
+def _percentiles(values):
+    if not values:
+        return {}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'p50': p50, 'p90': p90, 'p99': p99, 'max': max(values)}
+
+
+def summarise(games):
+    solved = [game for game in games if game['solved']]
+    latencies = [t for game in games for t in game['solve_seconds']]
+    turns = max((len(game['search_space_hist']) for game in games), default=0)
+
+    per_turn_latency = {}
+    search_space = {}
+    for turn in range(turns):
+        per_turn_latency[turn + 1] = _percentiles([game['solve_seconds'][turn] for game in games
+                                                   if len(game['solve_seconds']) > turn])
+        sizes = [game['search_space_hist'][turn] for game in games if len(game['search_space_hist']) > turn]
+        search_space[turn + 1] = {'games': len(sizes), 'mean': float(np.mean(sizes)), 'median': float(np.median(sizes))}
+
+    return {
+        'games': len(games),
+        'solved': len(solved),
+        'failure_rate': 1 - len(solved) / len(games) if games else None,
+        'average_guesses': float(np.mean([len(game['guesses']) for game in solved])) if solved else None,
+        'solve_latency': _percentiles(latencies),
+        'solve_latency_by_turn': per_turn_latency,
+        'search_space_by_turn': search_space,
+    }
+
+
+def simulate(targets, policy='freq', workers=None, chunksize=32, cold=True):
+    load_index()
+    if workers == 1:
+        return _play_chunk(targets, policy, cold)
+
+    chunks = [targets[i:i + chunksize] for i in range(0, len(targets), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(), initializer=load_index) as pool:
+        results = pool.map(_play_chunk, chunks, [policy] * len(chunks), [cold] * len(chunks))
+        return [game for chunk in results for game in chunk]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play the solver against every answer word')
+    parser.add_argument('--policy', choices=['freq', 'entropy'], default='freq')
+    parser.add_argument('--answers', type=int, default=2500, help='size of the answer list')
+    parser.add_argument('--limit', type=int, default=None, help='only play the first N answers')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cached', action='store_true', help='keep solve results across games')
+    parser.add_argument('--out', default='simulation.json')
+    args = parser.parse_args()
+
+    targets = answer_list(args.answers)[:args.limit]
+    start = time.perf_counter()
+    games = simulate(targets, args.policy, args.workers or os.cpu_count(), cold=not args.cached)
+    summary = summarise(games)
+    summary['policy'] = args.policy
+    summary['wall_seconds'] = time.perf_counter() - start
+
+    with open(args.out, 'w') as f:
+        json.dump({'summary': summary, 'games': games}, f, indent=1)
+
+    # Averages are missing when no game was played or none was solved.
+    average, failures = summary['average_guesses'], summary['failure_rate']
+    median = summary['solve_latency'].get('p50')
+    print(f"{summary['solved']}/{summary['games']} solved, "
+          f"average {'n/a' if average is None else f'{average:.3f}'} guesses, "
+          f"failure rate {'n/a' if failures is None else f'{failures:.2%}'}, "
+          f"median solve {'n/a' if median is None else f'{median * 1000:.2f}'} ms")
+    print(f'Results written to {args.out}')
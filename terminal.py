@@ -0,0 +1,93 @@
+import os
+import sys
+import time
+
+CSI = '\x1b['
+
+
+class Screen():
+    # Remembers the last frame drawn and only rewrites the lines that changed,
+    # moving the cursor with ANSI escapes instead of clearing the terminal.
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.previous = None
+        if os.name == 'nt':
+            # Turns on ANSI escape handling in the Windows console.
+            os.system('')
+
+    def draw(self, lines, cursor=None):
+        lines = '\n'.join(lines).split('\n')
+        chunks = []
+        if self.previous is None:
+            chunks.append(f'{CSI}2J')
+            self.previous = []
+
+        for row, line in enumerate(lines):
+            if row >= len(self.previous) or self.previous[row] != line:
+                chunks.append(f'{CSI}{row + 1};1H{line}{CSI}K')
+        for row in range(len(lines), len(self.previous)):
+            chunks.append(f'{CSI}{row + 1};1H{CSI}K')
+        self.previous = lines
+
+        row, col = cursor if cursor is not None else (len(lines) - 1, len(lines[-1]))
+        chunks.append(f'{CSI}{row + 1};{col + 1}H')
+        self.out.write(''.join(chunks))
+        self.out.flush()
+
+    def clear(self):
+        self.out.write(f'{CSI}2J{CSI}H')
+        self.out.flush()
+        self.previous = None
+
+
+class KeyReader():
+    # Reads single keypresses with an optional timeout where the terminal
+    # allows it (live is True); otherwise callers fall back to read_line().
+    def __init__(self, stream=sys.stdin):
+        self.stream = stream
+        self.live = stream.isatty()
+        self._saved = None
+
+    def __enter__(self):
+        if self.live and os.name != 'nt':
+            import termios
+            import tty
+            self._saved = termios.tcgetattr(self.stream)
+            tty.setcbreak(self.stream)
+        return self
+
+    def __exit__(self, *exc):
+        if self._saved is not None:
+            import termios
+            termios.tcsetattr(self.stream, termios.TCSADRAIN, self._saved)
+            self._saved = None
+
+    def read_key(self, timeout=None):
+        # Returns None if no key arrived within timeout seconds.
+        if os.name == 'nt':
+            import msvcrt
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not msvcrt.kbhit():
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None
+                time.sleep(0.01)
+            key = msvcrt.getwch()
+            if key in ('\x00', '\xe0'):
+                msvcrt.getwch()
+                return ''
+            return key
+
+        import select
+        ready, _, _ = select.select([self.stream], [], [], timeout)
+        if not ready:
+            return None
+        key = os.read(self.stream.fileno(), 1).decode('latin-1')
+        if key == '\x1b':
+            # Swallow the rest of an escape sequence such as an arrow key.
+            while select.select([self.stream], [], [], 0)[0]:
+                os.read(self.stream.fileno(), 1)
+            return ''
+        return key
+
+    def read_line(self, prompt=''):
+        return input(prompt)
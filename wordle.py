@@ -1,26 +1,183 @@
-from nltk.corpus import words as dictionary
-import re
 import string
-import pandas as pd
-import seaborn as sns
-import os
+import numpy as np
+import copy
+import hashlib
+import time
+import profiling
+from cache import SolveCache
+from lexicon import lexicon_path, load_lexicon
+from patterns import GuessRecommender
 
 LETTERS = string.ascii_lowercase
 
-word_freq = pd.read_csv('unigram_freq.csv')
+# A game allows six guesses, each of which can add a yellow sequence.
+MAX_GUESSES = 6
 
-word_freq.columns = ['word','freq']
 
-nltk_dictionary = [word.lower() for word in dictionary.words() if len(word) == 5]
+class WordIndex():
+    # Packed per-word letter masks so solve() can filter with array ops
+    # instead of running regexes over every word.
+    def __init__(self, lexicon):
+        self.length = lexicon.dtype['word'].itemsize
+        self.words = lexicon['word'].astype(f'<U{self.length}')
+        self.freq = np.asarray(lexicon['freq'])
+        codes = np.ascontiguousarray(lexicon['word']).view(np.uint8).reshape(-1, self.length) - ord('a')
+        self.positions = np.left_shift(np.uint32(1), codes.astype(np.uint32))
+        self.presence = np.bitwise_or.reduce(self.positions, axis=1)
+        self.counts = np.zeros((len(codes), 26), dtype=np.uint8)
+        for pos in range(self.length):
+            self.counts[np.arange(len(codes)), codes[:, pos]] += 1
+        self.fingerprint = hashlib.sha1(np.ascontiguousarray(lexicon['word']).tobytes()).hexdigest()[:12]
+
+    def __len__(self):
+        return len(self.words)
+
+    @staticmethod
+    def letter_mask(letters):
+        mask = 0
+        for char in letters:
+            mask |= 1 << LETTERS.index(char)
+        return np.uint32(mask)
+
+    def filter(self, greens, yellow_sequence, blacks, min_counts=None, max_counts=None, subset=None):
+        # subset restricts the scan to an earlier result, e.g. when the
+        # constraints have only been tightened since the last solve.
+        green_masks = np.array([0 if char == '.' else self.letter_mask(char) for char in greens], dtype=np.uint32)
+        excluded = np.zeros(len(greens), dtype=np.uint32)
+        for seq in yellow_sequence:
+            for pos, char in enumerate(seq):
+                if char != '.':
+                    excluded[pos] |= self.letter_mask(char)
+        lows = np.zeros(26, dtype=np.uint8)
+        highs = np.full(26, self.length, dtype=np.uint8)
+        for char, n in (min_counts or {}).items():
+            lows[LETTERS.index(char)] = n
+        for char, n in (max_counts or {}).items():
+            highs[LETTERS.index(char)] = n
+        return self.filter_masks(green_masks, excluded, self.letter_mask(blacks), lows, highs, subset)
+
+    def filter_masks(self, greens, excluded, blacks, min_counts, max_counts, subset=None):
+        # filter() on packed constraints: per-position masks of the green
+        # letter and of the letters ruled out there by yellows, a mask of
+        # black letters and 26 lower and upper letter counts. Every letter
+        # ruled out somewhere by a yellow is in the answer.
+        if subset is None:
+            positions, presence, counts = self.positions, self.presence, self.counts
+        else:
+            positions, presence, counts = self.positions[subset], self.presence[subset], self.counts[subset]
+        started, n = profiling.clock(), len(presence)
+
+        required = np.bitwise_or.reduce(excluded, initial=np.uint32(0))
+        keep = (presence & required) == required
+        keep &= (presence & blacks) == 0
+        started, n = self._checkpoint('filter.letters', started, n, keep)
+        for pos, mask in enumerate(greens):
+            if mask:
+                keep &= positions[:, pos] == mask
+        started, n = self._checkpoint('filter.greens', started, n, keep)
+        for pos, mask in enumerate(excluded):
+            if mask:
+                keep &= (positions[:, pos] & mask) == 0
+        started, n = self._checkpoint('filter.yellows', started, n, keep)
+
+        # Letter multiplicities, e.g. "at least two s" or "exactly one e".
+        columns = np.flatnonzero((min_counts > 0) | (max_counts < self.length))
+        if len(columns):
+            letter_counts = counts[:, columns]
+            keep &= ((letter_counts >= min_counts[columns]) & (letter_counts <= max_counts[columns])).all(axis=1)
+            self._checkpoint('filter.counts', started, n, keep)
+
+        if subset is None:
+            return np.flatnonzero(keep)
+        return subset[keep]
+
+    @staticmethod
+    def _checkpoint(stage, started, n_in, keep):
+        # Survivors are only counted while profiling is enabled.
+        if started is None:
+            return None, n_in
+        n_out = int(np.count_nonzero(keep))
+        profiling.record(stage, started, n_in=n_in, n_out=n_out)
+        return profiling.clock(), n_out
+
+
+# One index, recommender and opening book per word length, loaded on demand.
+_word_indexes = {}
+_recommenders = {}
+_books = {}
+
+# Shared by every solver in the process. Other modules import it by name, so
+# change its memory budget or add an on-disk tier with solve_cache.configure()
+# rather than replacing it.
+solve_cache = SolveCache()
+
+def load_index(length=5):
+    # Loaded on first use from the prebuilt lexicon (see lexicon.py), which is
+    # rebuilt automatically when its sources change.
+    if length not in _word_indexes:
+        started = profiling.clock()
+        lexicon = load_lexicon(lexicon_path(length), length)
+        profiling.record('load.lexicon', started, n_out=len(lexicon))
+        started = profiling.clock()
+        _word_indexes[length] = WordIndex(lexicon)
+        profiling.record('load.index', started, n_out=len(lexicon))
+    return _word_indexes[length]
+
+def recommender(length=5):
+    # The pattern matrix is only loaded the first time a guess is recommended.
+    if length not in _recommenders:
+        word_index = load_index(length)
+        started = profiling.clock()
+        _recommenders[length] = GuessRecommender(word_index.words, word_index.freq)
+        profiling.record('load.patterns', started)
+    return _recommenders[length]
+
+def opening_book(length=5):
+    # State key -> guess for positions worked out offline: the opening turns
+    # from `python opening_book.py`, overridden by the full decision tree from
+    # `python decision_tree.py`. Empty until either is built.
+    if length not in _books:
+        from decision_tree import load_tree
+        from opening_book import load_book
+        fingerprint = load_index(length).fingerprint
+        _books[length] = {**load_book(fingerprint), **load_tree(fingerprint)}
+    return _books[length]
+
+class Suggestions():
+    # Solve result. The index is stored in frequency rank order and filtering
+    # keeps that order, so the top suggestions are just the first candidates.
+    def __init__(self, word_index, candidates):
+        self.word_index = word_index
+        self.candidates = candidates
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def top(self, n=10):
+        ranks = self.candidates[:n]
+        return [(str(word), float(freq)) for word, freq in zip(self.word_index.words[ranks], self.word_index.freq[ranks])]
+
+    def to_frame(self):
+        import pandas as pd
+
+        return pd.DataFrame({'possible_word': self.word_index.words[self.candidates],
+                             'freq': self.word_index.freq[self.candidates]})
 
-wordle_words = set(nltk_dictionary + list(word_freq['word'].str.lower()))
 
 class WordleSolver():
-    def __init__(self, greens='.....', yellows=[], blacks=''):
-        self.greens = greens
+    def __init__(self, greens=None, yellows=[], blacks='', length=5, max_yellows=MAX_GUESSES):
+        # max_yellows bounds the yellow sequences, one per guess with a yellow
+        # letter; multi-board games allow more guesses than a single board.
+        self.length = length
+        self.max_yellows = max_yellows
+        self.greens = '.' * length if greens is None else greens
         self.yellow_sequence = yellows[:]
         self.blacks = blacks
+        self.min_counts = {}
+        self.max_counts = {}
         self.search_space_hist = []
+        self._candidates = None
+        self._solved_constraints = None
         self.solve()
         
     @property
@@ -29,7 +186,7 @@ class WordleSolver():
     
     @greens.setter
     def greens(self, val):
-        assert len(val) == 5 and isinstance(val, str)
+        assert isinstance(val, str) and len(val) == self.length
         for char in val:
             assert char in LETTERS or char == '.'
         self._greens = val
@@ -41,7 +198,7 @@ class WordleSolver():
     @yellow_sequence.setter
     def yellow_sequence(self, val):
         assert isinstance(val, list)
-        assert len(val) <= 5
+        assert len(val) <= self.max_yellows
         self._yellow_sequence = val
             
     @property
@@ -58,7 +215,7 @@ class WordleSolver():
             for seq in self.yellow_sequence:
                 assert char not in seq
                 
-        dedup = set(val)
+        dedup = sorted(set(val))
         letters = ''
         for char in dedup:
             letters += char
@@ -67,8 +224,8 @@ class WordleSolver():
         
     def add_yellow(self, seq):
         assert isinstance(seq, str)
-        assert len(seq) == 5
-        assert len(self.yellow_sequence) + 1 <= 5
+        assert len(seq) == self.length
+        assert len(self.yellow_sequence) + 1 <= self.max_yellows
         for char in seq:
             assert char in LETTERS or char == '.'
             
@@ -84,47 +241,79 @@ class WordleSolver():
         assert len(val) + len(self.blacks) <= 25
             
         dedup = sorted(set(self.blacks + val))
-        self.blacks = ''
+        blacks = ''
         for char in dedup:
             assert char in LETTERS
-            if char not in self.greens:
-                if len(self.yellow_sequence) == 0:
-                    self.blacks += char
-                else:
-                    for seq in self.yellow_sequence:
-                        if char not in seq:
-                            self.blacks += char
+            if char not in self.greens and all(char not in seq for seq in self.yellow_sequence):
+                blacks += char
+        self.blacks = blacks
                         
     def reset_blacks(self):
         self.blacks = ''
+        
+    def add_count(self, char, minimum=None, maximum=None):
+        # The answer has at least `minimum` and at most `maximum` of char.
+        assert char in LETTERS
+        if minimum is not None:
+            assert 0 <= minimum <= self.length
+            self.min_counts[char] = max(self.min_counts.get(char, 0), minimum)
+        if maximum is not None:
+            assert 0 <= maximum <= self.length
+            self.max_counts[char] = min(self.max_counts.get(char, self.length), maximum)
+            
+    def reset_counts(self):
+        self.min_counts = {}
+        self.max_counts = {}
+        
+    def add_guess(self, guess, colours):
+        # Applies the feedback for one guess. colours has one of g(reen),
+        # y(ellow) or b(lack) per letter, e.g. add_guess('speed', 'bbyby').
+        # A black copy of a letter that is coloured elsewhere in the guess
+        # caps that letter's count and rules it out at that position.
+        assert isinstance(guess, str) and isinstance(colours, str)
+        assert len(guess) == self.length and len(colours) == self.length
+        for char, colour in zip(guess, colours):
+            assert char in LETTERS
+            assert colour in 'gyb'
+            
+        found = {}
+        for char, colour in zip(guess, colours):
+            if colour != 'b':
+                found[char] = found.get(char, 0) + 1
+                
+        # Everything is worked out and checked before the state changes, so
+        # a rejected guess leaves the solver as it was.
+        greens = list(self.greens)
+        yellow = ''
+        for pos, (char, colour) in enumerate(zip(guess, colours)):
+            if colour == 'g':
+                greens[pos] = char
+            yellow += char if colour == 'y' or (colour == 'b' and char in found) else '.'
+        yellows = self.yellow_sequence[:]
+        if yellow != '.' * self.length:
+            yellows.append(yellow)
+        assert len(yellows) <= self.max_yellows
+        
+        self.greens = ''.join(greens)
+        self.yellow_sequence = yellows
+        for char in set(guess):
+            if char in found:
+                black = any(c == char and colour == 'b' for c, colour in zip(guess, colours))
+                self.add_count(char, minimum=found[char], maximum=found[char] if black else None)
+        blacks = set(self.blacks) | set(char for char in guess if char not in found)
+        self.blacks = ''.join(char for char in blacks
+                              if char not in self.greens and all(char not in seq for seq in yellows))
             
         
-    def _possible_words(self):
-        knowns = ['\w' if char == '.' else char for char in self.greens]
-        pattern = f'^[{knowns[0]}][{knowns[1]}][{knowns[2]}][{knowns[3]}][{knowns[4]}]$'
-        yellows = set([char for pos in self.yellow_positions for char in pos if char != '.'])
-        self.possibles = []
-        for word in wordle_words:
-            if all([True if l in word else False for l in yellows]) and all([True if b not in word else False for b in self.blacks]):
-                if re.match(pattern, word):
-                    self.posibles.append(word)
-                    
-    def _yellow_filter(self):
-        patterns = []
-        for pos in self.yellow_positions:
-            pattern = ''
-            for char in pos:
-                if char == '.':
-                    pattern += f'[a-z]'
-                else:
-                    pattern += f'[^{char}]'
-            patterns.append(pattern)
+    def copy(self):
+        # Independent constraints, shared (read-only) solve results.
+        other = copy.copy(self)
+        other._yellow_sequence = self.yellow_sequence[:]
+        other.min_counts = dict(self.min_counts)
+        other.max_counts = dict(self.max_counts)
+        other.search_space_hist = self.search_space_hist[:]
+        return other
         
-        self.filtered_possibles = []
-        for possible in self.possibles:
-            if all([True if re.match(pattern,possible) else False for pattern in patterns]):
-                self.filtered_possibles.append(possible)
-  
     def print_yellows(self):
         pretty_print = ''
         for seq in self.yellow_sequence:
@@ -132,217 +321,345 @@ class WordleSolver():
             
         return pretty_print
     
-    def solve(self):
-        possible_words = []
-        suggestions = []
-        
-        knowns = ['\w' if char == '.' else char for char in self.greens]
-        green_pattern = f'^[{knowns[0]}][{knowns[1]}][{knowns[2]}][{knowns[3]}][{knowns[4]}]$'
-        yellows = set([char for pos in self.yellow_sequence for char in pos if char != '.'])
-        
-        for word in wordle_words:
-            if all([True if l in word else False for l in yellows]) and all([True if b not in word else False for b in self.blacks]):
-                if re.match(green_pattern, word):
-                    possible_words.append(word)
-                    
-        yellow_patterns = []
-        for seq in self.yellow_sequence:
-            pattern = ''
-            for char in seq:
-                if char == '.':
-                    pattern += f'[a-z]'
-                else:
-                    pattern += f'[^{char}]'
-            yellow_patterns.append(pattern)
-        
-        filtered_possibles = []
-        for word in possible_words:
-            if all([True if re.match(pattern, word) else False for pattern in yellow_patterns]):
-                filtered_possibles.append(word)
+    def print_counts(self):
+        pretty_print = ''
+        for char in sorted(set(self.min_counts) | set(self.max_counts)):
+            low, high = self.min_counts.get(char, 0), self.max_counts.get(char, self.length)
+            if low == high:
+                pretty_print += f'{char}={low} '
+            elif high == self.length:
+                pretty_print += f'{char}>={low} '
+            elif low == 0:
+                pretty_print += f'{char}<={high} '
+            else:
+                pretty_print += f'{char}{low}-{high} '
+                
+        return pretty_print
+    
+    def constraints(self):
+        # Counts are expanded to "at least k" / "at most k" facts so that a
+        # tighter count is a superset of a looser one.
+        greens = frozenset((pos, char) for pos, char in enumerate(self.greens) if char != '.')
+        yellows = frozenset((pos, char) for seq in self.yellow_sequence for pos, char in enumerate(seq) if char != '.')
+        at_least = frozenset((char, k) for char, n in self.min_counts.items() for k in range(1, n + 1))
+        at_most = frozenset((char, k) for char, n in self.max_counts.items() for k in range(n, self.length))
+        return greens, yellows, frozenset(self.blacks), at_least, at_most
+    
+    def _tightens(self, constraints):
+        # Every constraint is a conjunction of (position, letter) and letter
+        # facts, so holding all the old facts means the old survivors are a
+        # superset of the new ones.
+        if self._solved_constraints is None:
+            return False
+        return all(old <= new for old, new in zip(self._solved_constraints, constraints))
+    
+    def best_guesses(self, n=10):
+        import pandas as pd
         
-        self.word_suggestions = pd.DataFrame(pd.Series(filtered_possibles), columns=['possible_word'])
-        self.word_suggestions = (self.word_suggestions.merge(word_freq, left_on='possible_word', right_on='word', how='left')
-                                     .drop('word',axis='columns')
-                                     .drop_duplicates()
-                                     .sort_values(by='freq',ascending=False)
-                                     .reset_index(drop=True))
+        guesses, scores = recommender(self.length).best(self._candidates, n)
+        return pd.DataFrame({'guess': load_index(self.length).words[guesses], 'entropy': scores})
+    
+    def recommend(self):
+        # Opening positions are looked up in the book before anything is scored.
+        started = profiling.clock()
+        guess = opening_book(self.length).get(self.state_key())
+        hit = guess is not None
+        if not hit:
+            guesses, _ = recommender(self.length).best(self._candidates, 1)
+            guess = str(load_index(self.length).words[guesses[0]])
+        profiling.record('recommend', started, n_in=len(self._candidates), hit=hit)
+        return guess
+    
+    def state_key(self):
+        # Canonical encoding of the constraints: greens, the letters ruled out
+        # at each position by yellows, sorted blacks, then letter count bounds
+        # as letter/min/max. States that filter identically encode identically
+        # whatever order they were entered in.
+        yellows = self.constraints()[1]
+        excluded = ['' for _ in self.greens]
+        for pos, char in sorted(yellows):
+            excluded[pos] += char
+        counts = ''
+        for char in sorted(set(self.min_counts) | set(self.max_counts)):
+            low, high = self.min_counts.get(char, 0), self.max_counts.get(char, self.length)
+            # Bounds the greens and yellows already imply are left out, so
+            # add_guess() states match the same state entered by hand.
+            if low <= max(self.greens.count(char), int(char in ''.join(excluded))):
+                low = 0
+            if low or high < self.length:
+                counts += f'{char}{low}{high}'
+        return f"{self.greens}|{'/'.join(excluded)}|{''.join(sorted(self.blacks))}|{counts}"
+    
+    def solve(self):
+        word_index = load_index(self.length)
+        solve_started = started = profiling.clock()
+        constraints = self.constraints()
+        key = f'{word_index.fingerprint}:{self.state_key()}'
+        candidates = solve_cache.get(key)
+        profiling.record('solve.cache', started, hit=candidates is not None)
+        if candidates is None:
+            started = profiling.clock()
+            subset = self._candidates if self._tightens(constraints) else None
+            candidates = solve_cache.put(key, word_index.filter(self.greens, self.yellow_sequence, self.blacks,
+                                                                self.min_counts, self.max_counts, subset=subset))
+            profiling.record('solve.filter', started, n_in=len(word_index if subset is None else subset),
+                             n_out=len(candidates), incremental=subset is not None)
+        self._candidates = candidates
+        self._solved_constraints = constraints
+        self.word_suggestions = Suggestions(word_index, self._candidates)
         
         self.search_space = len(self.word_suggestions)
         self.search_space_hist.append(self.search_space)
+        profiling.record('solve', solve_started, n_out=self.search_space)
         
         return self.word_suggestions
     
     
-solver = WordleSolver()
-
-def table_gui():
+def table_gui(shown):
+    lines = []
+    suggestions = shown.word_suggestions.top(10)
     for i in range(10):
-        if i >= len(solver.word_suggestions):
-            print('|                         |           |              |                                 |')
+        if i >= len(suggestions):
+            lines.append('|                         |           |              |                                 |')
         else:
+            word, freq = suggestions[i]
             list_num = f'{i+1}.'
-            word_print = '|' + list_num + ' '*(4-len(list_num)) + solver.word_suggestions['possible_word'][i] + '  |'
+            word_print = '|' + list_num + ' '*(4-len(list_num)) + word + '  |'
             try:
-                freq = str(int(solver.word_suggestions['freq'][i]))
+                freq = str(int(freq))
             except:
-                freq = str(solver.word_suggestions['freq'][i])
+                freq = str(freq)
             freq_print = '  '+ freq + ' '*(12-len(freq)) + '|'
             tr_for_gui = word_print + freq_print
-            print(f'|                         {tr_for_gui}                                 |')
+            lines.append(f'|                         {tr_for_gui}                                 |')
+    return lines
 
 
-def main_gui(error):
+def main_gui(error, preview=None):
+    # preview is a solver to show the search space and suggestions of
+    # instead of the current one, see preview_solver().
+    shown = preview or solver
+    lines = []
     msg = ''
     if error:
         msg = 'ERROR: Enter a viable command.'
     yellows_for_gui = solver.print_yellows() + ' '*(32-len(solver.print_yellows()))
     blacks_for_gui = solver.blacks + ' '*(32-len(solver.blacks)-len(str(len(solver.blacks)))+1)
+    counts = solver.print_counts()
+    counts_for_gui = counts + ' '*(32-len(counts)-len(str(len(counts.split())))+1)
     greens = len(list(filter(lambda x: x != '.', solver.greens)))
-    search_space_for_gui = str(solver.search_space) + ' '*(46-len(str(solver.search_space)))
+    search_space_for_gui = str(shown.search_space) + ' '*(46-len(str(shown.search_space)))
     
-    print('+----------------------------------- Wordle Solver  -----------------------------------+')
-    print('|                                                                                      |')
-    print('|            [-r] Run solver                                                           |')
-    print('|                                                                                      |')
-    print(f'|            [1] Change green letters      Current [{greens}] {solver.greens}                           |')
-    print(f'|            [2] Add yellow sequence       Current [{len(solver.yellow_sequence)}] {yellows_for_gui}|')
-    print(f'|            [3] Add black letters         Current [{len(solver.blacks)}] {blacks_for_gui}|')
-    print('|                                                                                      |')
-    print('|            [4] Reset yellow positions                                                |')
-    print('|            [5] Reset black letters                                                   |')
-    print('|                                                                                      |')
-    print('|            [-n] New solver                                                           |')
-    print('|            [-x] Quit                                                                 |')
-    print('|                                                                                      |')
-    print('|                                                                                      |')
-    print(f'|                          Search Space: {search_space_for_gui}|')
-    print('|                         +--------------------------+                                 |')
-    print('|                         | Current word suggestions |                                 |')
-    print('|                         +-----------+--------------+                                 |')
-    print('|                         |    word   |  frequency   |                                 |')
-    print('|                         +-----------+--------------+                                 |')
-    table_gui()
-    print('|                         +-----------+--------------+                                 |')
-    print('|                                                                                      |')
-    print('+--------------------------------------------------------------------------------------+')
-    print('Navigate [ -r, 1, 2, 3, 4, 5, -n, -h, -x ]\n')
-    print(msg)
+    lines.append('+----------------------------------- Wordle Solver  -----------------------------------+')
+    lines.append('|                                                                                      |')
+    lines.append('|            [-r] Run solver                                                           |')
+    lines.append('|                                                                                      |')
+    lines.append(f'|            [1] Change green letters      Current [{greens}] {solver.greens}                           |')
+    lines.append(f'|            [2] Add yellow sequence       Current [{len(solver.yellow_sequence)}] {yellows_for_gui}|')
+    lines.append(f'|            [3] Add black letters         Current [{len(solver.blacks)}] {blacks_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append('|            [4] Reset yellow positions                                                |')
+    lines.append('|            [5] Reset black letters                                                   |')
+    lines.append('|            [6] Enter a guess and its colours                                         |')
+    lines.append(f'|            [7] Reset letter counts       Current [{len(counts.split())}] {counts_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append('|            [-n] New solver                                                           |')
+    lines.append('|            [-x] Quit                                                                 |')
+    lines.append('|                                                                                      |')
+    lines.append('|                                                                                      |')
+    lines.append(f'|                          Search Space: {search_space_for_gui}|')
+    lines.append('|                         +--------------------------+                                 |')
+    lines.append('|                         | Current word suggestions |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                         |    word   |  frequency   |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines += table_gui(shown)
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                                                                                      |')
+    lines.append('+--------------------------------------------------------------------------------------+')
+    lines.append('Navigate [ -r, 1, 2, 3, 4, 5, 6, 7, -n, -h, -x ]\n')
+    lines.append(msg)
+    return lines
     
 
-def green_gui(error):
+def green_gui(error, preview=None):
+    shown = preview or solver
+    lines = []
     msg = ''
     if error:
         msg = 'ERROR: Must enter 5 characters with letters and \'.\''
         
     yellows_for_gui = solver.print_yellows() + ' '*(32-len(solver.print_yellows()))
     blacks_for_gui = solver.blacks + ' '*(32-len(solver.blacks)-len(str(len(solver.blacks)))+1)
+    counts = solver.print_counts()
+    counts_for_gui = counts + ' '*(32-len(counts)-len(str(len(counts.split())))+1)
     greens = len(list(filter(lambda x: x != '.', solver.greens)))
-    search_space_for_gui = str(solver.search_space) + ' '*(46-len(str(solver.search_space)))
-    print('+---------------------------------- Change greens -------------------------------------+')
-    print('|                                                                                      |')
-    print('|            [-r] Run solver                                                           |')
-    print('|                                                                                      |')
-    print('|            [-b] Back                                                                 |')
-    print(f'|            [2] Add yellow sequence       Current [{len(solver.yellow_sequence)}] {yellows_for_gui}|')
-    print(f'|            [3] Add black letters         Current [{len(solver.blacks)}] {blacks_for_gui}|')
-    print('|                                                                                      |')
-    print('|            [4] Reset yellow positions                                                |')
-    print('|            [5] Reset black letters                                                   |')
-    print('|                                                                                      |')
-    print(f'|                          Current greens [{greens}] {solver.greens}                                    |')
-    print('|                                                                                      |')
-    print('|                                                                                      |')
-    print(f'|                          Search Space: {search_space_for_gui}|')
-    print('|                         +--------------------------+                                 |')
-    print('|                         | Current word suggestions |                                 |')
-    print('|                         +-----------+--------------+                                 |')
-    print('|                         |    word   |  frequency   |                                 |')
-    print('|                         +-----------+--------------+                                 |')
-    table_gui()
-    print('|                         +-----------+--------------+                                 |')
-    print('|                                                                                      |')
-    print('+--------------------------------------------------------------------------------------+')
-    print('Enter new greens [ ex: s..r. ]')
-    print('\'-b\' to go back.\n')
-    print(msg)
+    search_space_for_gui = str(shown.search_space) + ' '*(46-len(str(shown.search_space)))
+    lines.append('+---------------------------------- Change greens -------------------------------------+')
+    lines.append('|                                                                                      |')
+    lines.append('|            [-r] Run solver                                                           |')
+    lines.append('|                                                                                      |')
+    lines.append('|            [-b] Back                                                                 |')
+    lines.append(f'|            [2] Add yellow sequence       Current [{len(solver.yellow_sequence)}] {yellows_for_gui}|')
+    lines.append(f'|            [3] Add black letters         Current [{len(solver.blacks)}] {blacks_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append('|            [4] Reset yellow positions                                                |')
+    lines.append('|            [5] Reset black letters                                                   |')
+    lines.append('|            [6] Enter a guess and its colours                                         |')
+    lines.append(f'|            [7] Reset letter counts       Current [{len(counts.split())}] {counts_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append(f'|                          Current greens [{greens}] {solver.greens}                                    |')
+    lines.append('|                                                                                      |')
+    lines.append('|                                                                                      |')
+    lines.append(f'|                          Search Space: {search_space_for_gui}|')
+    lines.append('|                         +--------------------------+                                 |')
+    lines.append('|                         | Current word suggestions |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                         |    word   |  frequency   |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines += table_gui(shown)
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                                                                                      |')
+    lines.append('+--------------------------------------------------------------------------------------+')
+    lines.append('Enter new greens [ ex: s..r. ]')
+    lines.append('\'-b\' to go back.\n')
+    lines.append(msg)
+    return lines
     
 
-def yellow_gui(error):
+def yellow_gui(error, preview=None):
+    shown = preview or solver
+    lines = []
     if error:
-        msg = 'ERROR: Must enter 5 characters with letters and \'.\' (Note: Cannot have more than 5 yellow sequences)'
+        msg = 'ERROR: Must enter 5 characters with letters and \'.\' (Note: Cannot have more than 6 yellow sequences)'
     else:
         msg = ''
         
     yellows_for_gui = solver.print_yellows() + ' '*(40-len(solver.print_yellows()))
     blacks_for_gui = solver.blacks + ' '*(32-len(solver.blacks)-len(str(len(solver.blacks)))+1)
+    counts = solver.print_counts()
+    counts_for_gui = counts + ' '*(32-len(counts)-len(str(len(counts.split())))+1)
     greens = len(list(filter(lambda x: x != '.', solver.greens)))
-    search_space_for_gui = str(solver.search_space) + ' '*(46-len(str(solver.search_space)))
-    print('+-------------------------------- Add yellow sequence ---------------------------------+')
-    print('|                                                                                      |')
-    print('|            [-r] Run solver                                                           |')
-    print('|                                                                                      |')
-    print(f'|            [1] Change green letters      Current [{greens}] {solver.greens}                           |')
-    print('|            [-b] Back                                                                 |')
-    print(f'|            [3] Add black letters         Current [{len(solver.blacks)}] {blacks_for_gui}|')
-    print('|                                                                                      |')
-    print('|            [4] Reset yellow positions                                                |')
-    print('|            [5] Reset black letters                                                   |')
-    print('|                                                                                      |')
-    print(f'|                          Current yellows [{len(solver.yellow_sequence)}] {yellows_for_gui}|')
-    print('|                                                                                      |')
-    print('|                                                                                      |')
-    print(f'|                          Search Space: {search_space_for_gui}|')
-    print('|                         +--------------------------+                                 |')
-    print('|                         | Current word suggestions |                                 |')
-    print('|                         +-----------+--------------+                                 |')
-    print('|                         |    word   |  frequency   |                                 |')
-    print('|                         +-----------+--------------+                                 |')
-    table_gui()
-    print('|                         +-----------+--------------+                                 |')
-    print('|                                                                                      |')
-    print('+--------------------------------------------------------------------------------------+')
-    print('Add yellow sequence [ex: d..s. ]')
-    print('\'-b\' to go back\n')
-    print(msg)
+    search_space_for_gui = str(shown.search_space) + ' '*(46-len(str(shown.search_space)))
+    lines.append('+-------------------------------- Add yellow sequence ---------------------------------+')
+    lines.append('|                                                                                      |')
+    lines.append('|            [-r] Run solver                                                           |')
+    lines.append('|                                                                                      |')
+    lines.append(f'|            [1] Change green letters      Current [{greens}] {solver.greens}                           |')
+    lines.append('|            [-b] Back                                                                 |')
+    lines.append(f'|            [3] Add black letters         Current [{len(solver.blacks)}] {blacks_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append('|            [4] Reset yellow positions                                                |')
+    lines.append('|            [5] Reset black letters                                                   |')
+    lines.append('|            [6] Enter a guess and its colours                                         |')
+    lines.append(f'|            [7] Reset letter counts       Current [{len(counts.split())}] {counts_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append(f'|                          Current yellows [{len(solver.yellow_sequence)}] {yellows_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append('|                                                                                      |')
+    lines.append(f'|                          Search Space: {search_space_for_gui}|')
+    lines.append('|                         +--------------------------+                                 |')
+    lines.append('|                         | Current word suggestions |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                         |    word   |  frequency   |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines += table_gui(shown)
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                                                                                      |')
+    lines.append('+--------------------------------------------------------------------------------------+')
+    lines.append('Add yellow sequence [ex: d..s. ]')
+    lines.append('\'-b\' to go back\n')
+    lines.append(msg)
+    return lines
     
-def black_gui(error):
+def black_gui(error, preview=None):
+    shown = preview or solver
+    lines = []
     msg = ''
     if error:
         msg = 'ERROR: Must enter letters only. (Note: Cannot have more than 25 black letters)'
     yellows_for_gui = solver.print_yellows() + ' '*(32-len(solver.print_yellows()))
     blacks_for_gui = solver.blacks + ' '*(34-len(solver.blacks)-len(str(len(solver.blacks)))+1)
+    counts = solver.print_counts()
+    counts_for_gui = counts + ' '*(32-len(counts)-len(str(len(counts.split())))+1)
+    greens = len(list(filter(lambda x: x != '.', solver.greens)))
+    search_space_for_gui = str(shown.search_space) + ' '*(46-len(str(shown.search_space)))
+    lines.append('+-------------------------------- Add black letters -----------------------------------+')
+    lines.append('|                                                                                      |')
+    lines.append('|            [-r] Run solver                                                           |')
+    lines.append('|                                                                                      |')
+    lines.append(f'|            [1] Change green letters      Current [{greens}] {solver.greens}                           |')
+    lines.append(f'|            [2] Add yellow sequence       Current [{len(solver.yellow_sequence)}] {yellows_for_gui}|')
+    lines.append('|            [-b] Back                                                                 |')
+    lines.append('|                                                                                      |')
+    lines.append('|            [4] Reset yellow sequences                                                |')
+    lines.append('|            [5] Reset black letters                                                   |')
+    lines.append('|            [6] Enter a guess and its colours                                         |')
+    lines.append(f'|            [7] Reset letter counts       Current [{len(counts.split())}] {counts_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append(f'|                          Current black letters [{len(solver.blacks)}] {blacks_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append('|                                                                                      |')
+    lines.append(f'|                          Search Space: {search_space_for_gui}|')
+    lines.append('|                         +--------------------------+                                 |')
+    lines.append('|                         | Current word suggestions |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                         |    word   |  frequency   |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines += table_gui(shown)
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                                                                                      |')
+    lines.append('+------------------------------------------------------------------------------------- +')
+    lines.append('Add black letters [ex. \'gtu\' or \'g\' or \'gt\' ]')
+    lines.append('WARNING: letters found in green letters or a yellow sequence will not be added.')
+    lines.append('Use [6] to enter a whole guess and its colours instead.')
+    lines.append('\'-b\' to go back.\n')
+    lines.append(msg)
+    return lines
+
+def guess_gui(error, preview=None):
+    shown = preview or solver
+    lines = []
+    msg = ''
+    if error:
+        msg = 'ERROR: Must enter a 5 letter guess and 5 colours from g, y and b (Note: Cannot have more than 6 yellow sequences)'
+    yellows_for_gui = solver.print_yellows() + ' '*(32-len(solver.print_yellows()))
+    blacks_for_gui = solver.blacks + ' '*(32-len(solver.blacks)-len(str(len(solver.blacks)))+1)
+    counts = solver.print_counts()
+    counts_for_gui = counts + ' '*(32-len(counts)-len(str(len(counts.split())))+1)
     greens = len(list(filter(lambda x: x != '.', solver.greens)))
-    search_space_for_gui = str(solver.search_space) + ' '*(46-len(str(solver.search_space)))
-    print('+-------------------------------- Add black letters -----------------------------------+')
-    print('|                                                                                      |')
-    print('|            [-r] Run solver                                                           |')
-    print('|                                                                                      |')
-    print(f'|            [1] Change green letters      Current [{greens}] {solver.greens}                           |')
-    print(f'|            [2] Add yellow sequence       Current [{len(solver.yellow_sequence)}] {yellows_for_gui}|')
-    print('|            [-b] Back                                                                 |')
-    print('|                                                                                      |')
-    print('|            [4] Reset yellow sequences                                                |')
-    print('|            [5] Reset black letters                                                   |')
-    print('|                                                                                      |')
-    print(f'|                          Current black letters [{len(solver.blacks)}] {blacks_for_gui}|')
-    print('|                                                                                      |')
-    print('|                                                                                      |')
-    print(f'|                          Search Space: {search_space_for_gui}|')
-    print('|                         +--------------------------+                                 |')
-    print('|                         | Current word suggestions |                                 |')
-    print('|                         +-----------+--------------+                                 |')
-    print('|                         |    word   |  frequency   |                                 |')
-    print('|                         +-----------+--------------+                                 |')
-    table_gui()
-    print('|                         +-----------+--------------+                                 |')
-    print('|                                                                                      |')
-    print('+------------------------------------------------------------------------------------- +')
-    print('Add black letters [ex. \'gtu\' or \'g\' or \'gt\' ]')
-    print('WARNING: letters found in green letters or a yellow sequence will not be added.')
-    print('\'-b\' to go back.\n')
-    print(msg)
-
-def green_gui_action(user_input):
+    search_space_for_gui = str(shown.search_space) + ' '*(46-len(str(shown.search_space)))
+    lines.append('+---------------------------------- Enter a guess -------------------------------------+')
+    lines.append('|                                                                                      |')
+    lines.append('|            [-r] Run solver                                                           |')
+    lines.append('|                                                                                      |')
+    lines.append(f'|            [1] Change green letters      Current [{greens}] {solver.greens}                           |')
+    lines.append(f'|            [2] Add yellow sequence       Current [{len(solver.yellow_sequence)}] {yellows_for_gui}|')
+    lines.append(f'|            [3] Add black letters         Current [{len(solver.blacks)}] {blacks_for_gui}|')
+    lines.append('|                                                                                      |')
+    lines.append('|            [4] Reset yellow positions                                                |')
+    lines.append('|            [5] Reset black letters                                                   |')
+    lines.append(f'|            [7] Reset letter counts       Current [{len(counts.split())}] {counts_for_gui}|')
+    lines.append('|            [-b] Back                                                                 |')
+    lines.append('|                                                                                      |')
+    lines.append('|                                                                                      |')
+    lines.append(f'|                          Search Space: {search_space_for_gui}|')
+    lines.append('|                         +--------------------------+                                 |')
+    lines.append('|                         | Current word suggestions |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                         |    word   |  frequency   |                                 |')
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines += table_gui(shown)
+    lines.append('|                         +-----------+--------------+                                 |')
+    lines.append('|                                                                                      |')
+    lines.append('+--------------------------------------------------------------------------------------+')
+    lines.append('Enter a guess and its colours, g(reen) y(ellow) or b(lack) [ex: speed bbyby ]')
+    lines.append('Repeated letters and their counts are handled for you.')
+    lines.append('\'-b\' to go back.\n')
+    lines.append(msg)
+    return lines
+
+def green_gui_action(solver, user_input):
     try:
         solver.greens = user_input
         return True
@@ -350,86 +667,143 @@ def green_gui_action(user_input):
         return False
 
 
-def yellow_gui_action(user_input):
+def yellow_gui_action(solver, user_input):
     try:
         solver.add_yellow(user_input)
         return True
     except:
         return False
 
-def black_gui_action(user_input):
+def black_gui_action(solver, user_input):
     try:
         solver.add_blacks(user_input)
         return True
     except:
         return False
 
+def guess_gui_action(solver, user_input):
+    try:
+        guess, colours = user_input.split()
+        solver.add_guess(guess, colours)
+        return True
+    except:
+        return False
+
 navigations = {
     '-b' : main_gui,
     '1'  : green_gui,
     '2'  : yellow_gui,
     '3'  : black_gui,
-    '4'  : solver.reset_yellows,
-    '5'  : solver.reset_blacks,
+    '6'  : guess_gui,
+    '4'  : lambda: solver.reset_yellows(),
+    '5'  : lambda: solver.reset_blacks(),
+    '7'  : lambda: solver.reset_counts(),
 }
 
 gui_actions = {
     green_gui: green_gui_action,
     yellow_gui: yellow_gui_action,
     black_gui: black_gui_action,
+    guess_gui: guess_gui_action,
 }
 
+# Seconds without a keypress before the typed input is previewed.
+DEBOUNCE = 0.15
 
 
+def preview_solver(gui, user_input):
+    # Solves a copy of the solver with the half-typed input applied, or
+    # returns None when there is nothing (valid) to preview yet.
+    gui_action = gui_actions.get(gui)
+    if gui_action is None or not user_input:
+        return None
+    preview = solver.copy()
+    if not gui_action(preview, user_input.lower()):
+        return None
+    preview.solve()
+    return preview
 
 
+def read_command(screen, keys, gui, error):
+    # Redraws only what changed while the command is typed and re-solves
+    # live once typing pauses for DEBOUNCE seconds.
+    header = ['', '', '', '']
+    if not keys.live:
+        screen.draw(header + gui(error) + ['>>> '])
+        return keys.read_line().lower()
+
+    user_input = ''
+    preview = None
+    deadline = None
+    while True:
+        screen.draw(header + gui(error, preview) + [f'>>> {user_input}'])
+
+        timeout = None if deadline is None else max(0, deadline - time.monotonic())
+        key = keys.read_key(timeout)
+        if key is None:
+            deadline = None
+            preview = preview_solver(gui, user_input)
+            continue
+        if key in ('\r', '\n'):
+            return user_input.lower()
+        if key in ('\x7f', '\b'):
+            user_input = user_input[:-1]
+        elif key.isprintable() and key:
+            user_input += key
+        else:
+            continue
+        deadline = time.monotonic() + DEBOUNCE
+
 
 if __name__ == '__main__':
+    from terminal import KeyReader, Screen
     
-    clear_gui = lambda: os.system('cls')
+    solver = WordleSolver()
+    screen = Screen()
     
     gui = navigations['-b']
     error = False
     
     
-    while True:
-        clear_gui()
-        print('\n\n\n')
-        gui(error)
-        error = False
-        user_input = input('>>> ').lower()
-
-        if user_input == '-x':
-            clear_gui()
-            break
-
-        elif user_input == '-r':
-            solver.solve()
-            continue
+    with KeyReader() as keys:
+        while True:
+            user_input = read_command(screen, keys, gui, error)
+            error = False
 
-        elif user_input == '-n':
-            solver = WordleSolver()
-            gui = navigations['-b']
-            continue
+            if user_input == '-x':
+                screen.clear()
+                break
 
-        elif user_input == '-b':
-            gui = navigations['-b']
-            continue
+            elif user_input == '-r':
+                solver.solve()
+                continue
 
-        elif user_input in ['4','5']:
-            navigations[user_input]()
-            continue
-          
-        try:
-            gui = navigations[user_input]
-            continue
-        except:
-            pass
-        
-        try:
-            gui_action = gui_actions[gui]
-            action_success = gui_action(user_input)
-            if action_success:
-                error = False
-        except:
-            error = True
+            elif user_input == '-n':
+                solver = WordleSolver()
+                gui = navigations['-b']
+                continue
+
+            elif user_input == '-b':
+                gui = navigations['-b']
+                continue
+
+            elif user_input in ['4','5','7']:
+                navigations[user_input]()
+                solver.solve()
+                continue
+              
+            try:
+                gui = navigations[user_input]
+                continue
+            except:
+                pass
+            
+            # Solved straight away so the table matches what the preview
+            # showed; the result is usually already in the solve cache.
+            try:
+                gui_action = gui_actions[gui]
+                error = not gui_action(solver, user_input)
+            except:
+                error = True
+            if not error:
+                solver.solve()